@@ -1,6 +1,13 @@
+import atexit
+import itertools
+import threading
+from contextlib import closing, contextmanager
+from typing import NamedTuple, Optional
+
 import mysql.connector
-from mysql.connector import errorcode
-from retrying import retry
+from cachetools import TTLCache
+from mysql.connector import errorcode, pooling
+from tenacity import retry, retry_if_exception_type, stop_after_attempt, wait_exponential_jitter
 
 import settings
 from datetime import datetime
@@ -9,49 +16,295 @@ import logging
 TIME_FORMAT_NO_OFFESET = "%Y-%m-%d %H:%M:%S"
 TIME_FORMAT = TIME_FORMAT_NO_OFFESET + "%z"
 
+# Only transient connection-level failures are worth retrying; integrity
+# and programming errors will fail identically on every attempt.
+_RETRYABLE = (mysql.connector.errors.OperationalError,
+              mysql.connector.errors.InterfaceError,
+              mysql.connector.errors.PoolError)
+
+# Shared retry policy: three attempts, jittered exponential backoff,
+# original exception re-raised so callers see the real error type.
+_retry_transient = retry(retry=retry_if_exception_type(_RETRYABLE),
+                         stop=stop_after_attempt(3),
+                         wait=wait_exponential_jitter(initial=0.05, max=2.0),
+                         reraise=True)
+
+# Rows per multi-row INSERT issued by create_image_records. Overridable
+# from settings so deployments can tune it to their max_allowed_packet.
+BULK_INSERT_BATCH_SIZE = getattr(settings, 'BULK_INSERT_BATCH_SIZE', 1000)
+
+SELECT_COLUMNS = ("id, original_filename, url, universal_url, internal_filename, collection,"
+                  "original_path, notes, redacted, datetime, orig_md5")
+
+# Static pieces of the insert statement, built once at import instead of
+# per call. universal_url is always NULL at insert time.
+INSERT_COLUMNS = ("original_filename, url, universal_url, internal_filename, collection,"
+                  "original_path,notes,redacted,datetime,orig_md5")
+INSERT_ROW_SQL = "(%s,%s,NULL,%s,%s,%s,%s,%s,%s,%s)"
+
+class ImageRow(NamedTuple):
+    """One result row, fields in SELECT_COLUMNS order.
+
+    Rows live as these tuples inside the module (including the caches,
+    where their immutability makes sharing safe); the public getters call
+    to_dict() at the boundary so callers keep receiving plain dicts.
+    """
+    id: int
+    original_filename: Optional[str]
+    url: Optional[str]
+    universal_url: Optional[str]
+    internal_filename: Optional[str]
+    collection: Optional[str]
+    original_path: Optional[str]
+    notes: Optional[str]
+    redacted: Optional[int]
+    datetime: Optional[datetime]
+    orig_md5: Optional[str]
+
+    def to_dict(self):
+        return self._asdict()
+
+# Rows pulled from the server per fetchmany round trip on scan queries.
+FETCH_CHUNK_SIZE = 1000
+
+# Rows per batched CASE-expression UPDATE; sized to stay comfortably
+# under max_allowed_packet.
+UPDATE_BATCH_SIZE = 500
+
+# Fixed statement texts, built once at import like PATTERN_QUERIES so the
+# hot paths hand the same string object to the prepared-cursor cache on
+# every call instead of re-rendering an f-string.
+SELECT_BY_INTERNAL_FILENAME_SQL = (f"""SELECT {SELECT_COLUMNS}
+           FROM images
+           WHERE internal_filename = %s""")
+DELETE_BY_INTERNAL_FILENAME_SQL = """delete from images where internal_filename=%s"""
+COLLECTION_LIST_SQL = """select collection from collection"""
+
+
+def _fetch_rows(cursor):
+    """Drain a cursor positioned on a SELECT_COLUMNS query into ImageRows."""
+    row_list = []
+    while True:
+        rows = cursor.fetchmany(FETCH_CHUNK_SIZE)
+        if not rows:
+            break
+        row_list.extend(map(ImageRow._make, rows))
+    return row_list
+
+# Read-mostly lookups by stable key (internal filename, original MD5) are
+# served from this bounded in-process cache. Mutators invalidate the keys
+# they touch; the TTL bounds staleness if another writer (e.g. a second
+# server process) changes a row behind our back.
+METADATA_CACHE_TTL = getattr(settings, 'METADATA_CACHE_TTL', 300)
+_lookup_cache = TTLCache(maxsize=50000, ttl=METADATA_CACHE_TTL)
+_lookup_cache_lock = threading.RLock()
+
+# Pattern searches can match arbitrary rows, so their entries cannot be
+# invalidated per key the way the stable-key cache above is; they get a
+# separate short-TTL cache that any write simply clears.
+PATTERN_CACHE_TTL = getattr(settings, 'PATTERN_CACHE_TTL', 30)
+_pattern_cache = TTLCache(maxsize=4096, ttl=PATTERN_CACHE_TTL)
+
+# Text columns with a FULLTEXT index; non-exact searches on these use
+# MATCH ... AGAINST (inverted-index lookup) instead of a LIKE table scan.
+FULLTEXT_COLUMNS = ('original_filename', 'original_path')
+
+# Characters the boolean-mode fulltext parser treats as operators, plus
+# the LIKE wildcard '%' existing clients send. Bound verbatim, an
+# unbalanced '"' or a stray '@' in a search string is a fulltext syntax
+# error (ER_PARSE_ERROR out of MATCH ... AGAINST), so they are turned
+# into word breaks before the term is bound.
+_BOOLEAN_MODE_OPERATORS = str.maketrans({c: ' ' for c in '+-><()~*"@%'})
+
+
+def _boolean_mode_term(pattern):
+    """Rewrite a user search term for MATCH ... AGAINST IN BOOLEAN MODE.
+
+    The raw pattern may contain operator characters the parser would
+    reject or misread (a '-' mid-filename negates the following word);
+    reduce it to plain words, all required, with the last as the prefix.
+    A term with no indexable words left matches no rows rather than
+    erroring.
+    """
+    words = pattern.translate(_BOOLEAN_MODE_OPERATORS).split()
+    if not words:
+        return '""'
+    words[-1] += '*'
+    return ' '.join(f"+{word}" for word in words)
+
+# Statement text for get_image_record_by_pattern, built once so the server's
+# prepared-statement cache sees a constant string per (column, exact,
+# has_collection) combination instead of a fresh f-string per call.
+PATTERN_QUERIES = {}
+for _column in ('original_filename', 'original_path', 'orig_md5', 'internal_filename'):
+    for _exact in (True, False):
+        for _has_collection in (True, False):
+            if not _exact and _column in FULLTEXT_COLUMNS:
+                _where = f"MATCH({_column}) AGAINST(%s IN BOOLEAN MODE)"
+            else:
+                _where = f"{_column} {'=' if _exact else 'LIKE'} %s"
+            _query = (f"""SELECT {SELECT_COLUMNS}
+            FROM images
+            WHERE {_where}""")
+            if _has_collection:
+                _query += """ AND collection = %s"""
+            PATTERN_QUERIES[(_column, _exact, _has_collection)] = _query
+
+# LIKE fallbacks for the MATCH statements above. create_tables() adds
+# the FULLTEXT indexes, but it only runs from server.py's __main__
+# path; under uwsgi, or with a schema loaded from images_ddl.sql, they
+# can be absent and MATCH raises ER 1191. Those installs fall back to
+# the baseline LIKE scan instead of failing every non-exact search.
+PATTERN_LIKE_QUERIES = {}
+for _column in FULLTEXT_COLUMNS:
+    for _has_collection in (True, False):
+        _query = (f"""SELECT {SELECT_COLUMNS}
+            FROM images
+            WHERE {_column} LIKE %s""")
+        if _has_collection:
+            _query += """ AND collection = %s"""
+        PATTERN_LIKE_QUERIES[(_column, _has_collection)] = _query
+
+# Cleared the first time MATCH raises ER 1191, so later searches go
+# straight to LIKE instead of re-trying the missing index per query.
+_fulltext_available = True
+
+
+def _note_fulltext_missing():
+    global _fulltext_available
+    if _fulltext_available:
+        _fulltext_available = False
+        logging.warning(
+            "FULLTEXT indexes are missing (ER 1191); pattern searches "
+            "fall back to LIKE. Run create_tables() to add them.")
+
+# One connection is pinned per worker thread so repeat queries from the same
+# thread reuse an already-warm session instead of paying the pool checkout
+# (mutex + reset-session ping) or a fresh handshake on every request.
+_tls = threading.local()
+_pool = None
+_pool_lock = threading.Lock()
+
+# Set once create_tables has brought the schema up to date, so repeat
+# calls in the same process skip the DDL and catalog probes entirely.
+_migrated = False
+_migrated_lock = threading.Lock()
+
+
+def _get_pool():
+    global _pool
+    # Unlocked fast path; double-checked under the lock so concurrent first
+    # callers cannot each construct (and orphan) a pool.
+    if _pool is not None:
+        return _pool
+    with _pool_lock:
+        if _pool is None:
+            pool_size = getattr(settings, 'SQL_POOL_SIZE', 25)
+            # mysql-connector caps pool_size at 32.
+            if not 1 <= pool_size <= 32:
+                raise ValueError(f"SQL_POOL_SIZE must be between 1 and 32, got {pool_size}")
+            # The C-extension protocol implementation decodes rows several
+            # times faster than the pure-Python one; fall back quietly where
+            # the wheel doesn't ship it.
+            use_pure = not getattr(mysql.connector, 'HAVE_CEXT', False)
+            logging.info(f"Creating DB connection pool, size {pool_size}, use_pure {use_pure}")
+            _pool = pooling.MySQLConnectionPool(pool_name='image_db',
+                                                pool_size=pool_size,
+                                                pool_reset_session=getattr(settings, 'SQL_POOL_RESET_SESSION', False),
+                                                use_pure=use_pure,
+                                                compress=getattr(settings, 'SQL_COMPRESS', True),
+                                                user=settings.SQL_USER,
+                                                password=settings.SQL_PASSWORD,
+                                                host=settings.SQL_HOST,
+                                                port=settings.SQL_PORT,
+                                                database=settings.SQL_DATABASE)
+    return _pool
+
+
+def _close_thread_connection():
+    cnx = getattr(_tls, 'cnx', None)
+    _tls.cnx = None
+    if cnx is not None:
+        try:
+            cnx.close()
+        except Exception:
+            pass
+
+
+def release_thread_connection():
+    """Return this thread's pinned connection to the pool.
+
+    Pinning is normally left in place for the life of the worker thread,
+    but deployments that recycle threads (or want connections back in the
+    pool between requests) can call this from a request-teardown or uwsgi
+    post-request hook.
+    """
+    _close_thread_connection()
+
+
+atexit.register(_close_thread_connection)
+
 
 class ImageDb():
-    def __init__(self):
-        self.cnx = None
+    """Access to the image metadata database.
+
+    Instances hold no connection state and are cheap to construct;
+    connections live in the pool and are pinned per thread.
+    """
+
+    # Stateless by design; __slots__ keeps it that way (and skips the
+    # per-instance __dict__ for the instance-per-request usage pattern).
+    __slots__ = ()
 
     def log(self, msg):
         if settings.DEBUG_APP:
             print(msg)
 
-    def retry_if_operational_error(exception):
-        pass
-
-
-    @retry(retry_on_exception=lambda e: isinstance(e, mysql.connector.OperationalError), stop_max_attempt_number=3,
-           wait_exponential_multiplier=2)
-    def get_cursor(self):
+    @_retry_transient
+    def _acquire_connection(self):
+        cnx = getattr(_tls, 'cnx', None)
+        if cnx is not None and cnx.is_connected():
+            return cnx
+        _close_thread_connection()
+        _tls.cnx = _get_pool().get_connection()
+        return _tls.cnx
+
+    def _prepared_cursor(self, cnx, sql):
+        """Return a prepared cursor for sql, reusing one per connection.
+
+        cnx.cursor(prepared=True) re-prepares the statement server-side on
+        its first execute, so handing out a fresh cursor per call would
+        throw away the plan each time. Cursors are cached on the connection
+        keyed by statement text and die with it; callers must drain results
+        and must not close them.
+        """
+        cache = getattr(cnx, '_stmt_cache', None)
+        if cache is None:
+            cache = cnx._stmt_cache = {}
+        cursor = cache.get(sql)
+        if cursor is None:
+            cursor = cache[sql] = cnx.cursor(prepared=True)
+        return cursor
+
+    @contextmanager
+    def _get_connection(self):
+        """Yield this thread's pinned connection, acquiring one if needed.
+
+        On a connection-level failure the pinned connection is dropped so
+        the next call starts from a fresh pool checkout.
+        """
         try:
-            if self.cnx is None:
-                self.connect()
-            return self.cnx.cursor(buffered=True)
-        except mysql.connector.OperationalError as e:
-            logging.warning("Failed to connect, resetting DB connection and sleeping")
-            self.reset_connection()
-            raise e
-
-    def reset_connection(self):
-        self.log(f"Resetting connection to {settings.SQL_HOST}")
-
-        if self.cnx:
-            try:
-                self.cnx.close()
-            except Exception:
-                pass
-        self.connect()
+            yield self._acquire_connection()
+        except mysql.connector.OperationalError:
+            logging.warning("Connection failed, dropping the pinned DB connection")
+            _close_thread_connection()
+            raise
 
     def connect(self):
-
+        """Readiness probe: returns True once the database is reachable."""
         try:
-            self.cnx = mysql.connector.connect(user=settings.SQL_USER,
-                                               password=settings.SQL_PASSWORD,
-                                               host=settings.SQL_HOST,
-                                               port=settings.SQL_PORT,
-                                               database=settings.SQL_DATABASE)
+            with self._get_connection():
+                pass
 
         except mysql.connector.Error as err:
             if err.errno == errorcode.ER_ACCESS_DENIED_ERROR:
@@ -70,6 +323,15 @@ class ImageDb():
         return True
 
     def create_tables(self):
+        global _migrated
+        with _migrated_lock:
+            if _migrated:
+                self.log("Schema already migrated this process; skipping")
+                return
+            self._create_tables_locked()
+            _migrated = True
+
+    def _create_tables_locked(self):
         TABLES = {}
 
         TABLES['images'] = (
@@ -86,35 +348,88 @@ class ImageDb():
             "  `collection` varchar(50)"
             ") ENGINE=InnoDB")
 
-        cursor = self.get_cursor()
+        with self._get_connection() as cnx, closing(cnx.cursor(buffered=True)) as cursor:
+            for table_name in TABLES:
+                table_description = TABLES[table_name]
+                try:
+                    self.log(f"Creating table {table_name}...")
+                    self.log(f"Sql: {TABLES[table_name]}")
+                    cursor.execute(table_description)
+                except mysql.connector.Error as err:
+                    if err.errno == errorcode.ER_TABLE_EXISTS_ERROR:
+                        self.log("already exists.")
+                    else:
+                        self.log(err.msg)
+                else:
+                    self.log("OK")
+
+            # Reuse the same cursor/session for the schema migrations below;
+            # MySQL has no ADD COLUMN IF NOT EXISTS, so probe first. SHOW
+            # COLUMNS reads the table's own dictionary entry rather than
+            # scanning information_schema.
+            cursor.execute("SHOW COLUMNS FROM images LIKE 'orig_md5'")
+            column_exists = cursor.fetchone() is not None
+
+            if not column_exists:
+                # Add the "orig_md5" column to the "images" table
+                cursor.execute("ALTER TABLE images ADD COLUMN orig_md5 CHAR(32)")
+
+            self.create_indexes(cursor)
+
+    def create_indexes(self, cursor):
+        # Every getter filters on one of these columns; without secondary
+        # indexes each lookup is a full table scan. The (191) prefix keeps
+        # utf8mb4 key length under InnoDB's 767-byte limit.
+        INDEXES = {
+            'idx_internal_filename':
+                "CREATE INDEX idx_internal_filename ON images(internal_filename)",
+            'idx_orig_md5':
+                "CREATE INDEX idx_orig_md5 ON images(orig_md5)",
+            'idx_original_filename':
+                "CREATE INDEX idx_original_filename ON images(original_filename(191))",
+            'idx_original_path':
+                "CREATE INDEX idx_original_path ON images(original_path(191))",
+            'idx_collection_original_filename':
+                "CREATE INDEX idx_collection_original_filename ON images(collection, original_filename(191))",
+            # MATCH(col) requires a FULLTEXT index on exactly that column,
+            # so each searchable text column gets its own.
+            'ft_original_filename':
+                "ALTER TABLE images ADD FULLTEXT ft_original_filename (original_filename)",
+            'ft_original_path':
+                "ALTER TABLE images ADD FULLTEXT ft_original_path (original_path)",
+            # Dedup-by-construction for ingest: a second insert of the same
+            # original file into the same collection hits this key instead
+            # of creating a duplicate row. NULL md5s are unconstrained.
+            # Pre-existing duplicate rows must be cleaned up by hand before
+            # this index can be built; until then the failure is just logged.
+            'uq_orig_md5_collection':
+                "CREATE UNIQUE INDEX uq_orig_md5_collection ON images(orig_md5, collection)",
+            # Internal filenames are server-generated UUIDs, one row each;
+            # making that a real constraint lets re-registration of the same
+            # stored file land on the upsert path instead of duplicating.
+            'uq_internal_filename':
+                "CREATE UNIQUE INDEX uq_internal_filename ON images(internal_filename)",
+        }
 
-        for table_name in TABLES:
-            table_description = TABLES[table_name]
+        cursor.execute(
+            "SELECT DISTINCT index_name FROM information_schema.statistics"
+            " WHERE table_schema = DATABASE() AND table_name = 'images'")
+        existing = {row[0] for row in cursor.fetchall()}
+
+        for index_name in INDEXES:
+            if index_name in existing:
+                continue
             try:
-                self.log(f"Creating table {table_name}...")
-                self.log(f"Sql: {TABLES[table_name]}")
-                cursor.execute(table_description)
+                self.log(f"Creating index {index_name}...")
+                cursor.execute(INDEXES[index_name])
             except mysql.connector.Error as err:
-                if err.errno == errorcode.ER_TABLE_EXISTS_ERROR:
+                if err.errno == errorcode.ER_DUP_KEYNAME:
                     self.log("already exists.")
                 else:
                     self.log(err.msg)
             else:
                 self.log("OK")
 
-        cursor.close()
-        cursor = self.get_cursor()
-
-        cursor.execute(
-            "SELECT COUNT(*) FROM information_schema.columns WHERE table_name = 'images' AND column_name = 'orig_md5'")
-        column_exists = cursor.fetchone()[0]
-
-        if not column_exists:
-            # Add the "orig_md5" column to the "images" table
-            cursor.execute("ALTER TABLE images ADD COLUMN orig_md5 CHAR(32)")
-
-        cursor.close()
-
     def create_image_record(self,
                             original_filename,
                             url,
@@ -127,143 +442,270 @@ class ImageDb():
                             original_image_md5
                             ):
 
-        cursor = self.get_cursor()
-        if original_filename is None:
-            original_filename = "NULL"
-        if original_image_md5 is None:
-            original_image_md5 = "NULL"
-
-        add_image = (f"""INSERT INTO images
-                        (original_filename, url, universal_url, internal_filename, collection,original_path,notes,redacted,datetime,orig_md5)
-                        values (
-                        "{original_filename}", 
-                        "{url}", 
-                        NULL, 
-                        "{internal_filename}", 
-                        "{collection}", 
-                        "{original_path}", 
-                        "{notes}", 
-                        "{int(redacted)}", 
-                        "{datetime_record.strftime(TIME_FORMAT_NO_OFFESET)}",
-                        "{original_image_md5}")""")
-
-        self.log(f"Inserting imageInserting image record. SQL: {add_image}")
-        cursor.execute(add_image)
-        self.cnx.commit()
-        cursor.close()
-
-    @retry(retry_on_exception=lambda e: isinstance(e, Exception), stop_max_attempt_number=3)
-    def update_redacted(self, internal_filename, is_redacted):
-        sql = f"""
-        update images set redacted = {is_redacted} where internal_filename = '{internal_filename}' 
+        return self.create_image_records([(original_filename,
+                                           url,
+                                           internal_filename,
+                                           collection,
+                                           original_path,
+                                           notes,
+                                           redacted,
+                                           datetime_record,
+                                           original_image_md5)])
+
+    def create_image_records(self, rows):
+        """Insert many image records in one round trip per batch.
+
+        rows is a list of tuples in the same order as the
+        create_image_record arguments. Rows are chunked into
+        BULK_INSERT_BATCH_SIZE slices; each slice is written with a single
+        multi-row INSERT and committed once.
+
+        Re-inserting an (orig_md5, collection) pair or internal filename
+        that already exists lands on the existing row instead of failing:
+        the mutable fields (url, notes, redacted) are refreshed from the
+        new values and everything else is left alone. For a single-row
+        insert the returned lastrowid is then the id of the existing row,
+        so callers can tell "inserted" from "already present".
         """
+        last_row_id = None
+        for start in range(0, len(rows), BULK_INSERT_BATCH_SIZE):
+            chunk = rows[start:start + BULK_INSERT_BATCH_SIZE]
+            params = list(itertools.chain.from_iterable(
+                (original_filename,
+                 url,
+                 internal_filename,
+                 collection,
+                 original_path,
+                 notes,
+                 1 if redacted else 0,
+                 datetime_record.strftime(TIME_FORMAT_NO_OFFESET) if datetime_record else None,
+                 original_image_md5)
+                for (original_filename, url, internal_filename, collection, original_path,
+                     notes, redacted, datetime_record, original_image_md5) in chunk))
+
+            add_images = (f"""INSERT INTO images
+                            ({INSERT_COLUMNS})
+                            values {",".join([INSERT_ROW_SQL] * len(chunk))}
+                            ON DUPLICATE KEY UPDATE id = LAST_INSERT_ID(id),
+                                url = VALUES(url),
+                                notes = VALUES(notes),
+                                redacted = VALUES(redacted)""")
+
+            self.log(f"Inserting {len(chunk)} image record(s). SQL: {add_images}")
+            with self._get_connection() as cnx:
+                cursor = self._prepared_cursor(cnx, add_images)
+                cursor.execute(add_images, params)
+                cnx.commit()
+                last_row_id = cursor.lastrowid
+            for row in chunk:
+                self._invalidate_lookup_cache(internal_filename=row[2],
+                                              orig_md5=row[8],
+                                              collection=row[3])
+        return last_row_id
+
+    def update_redacted(self, internal_filename, is_redacted):
+        self.update_redacted_bulk([(internal_filename, is_redacted)])
 
-        logging.debug(f"update redacted: {sql}")
-        cursor = self.get_cursor()
-        cursor.execute(sql)
-        self.cnx.commit()
-        cursor.close()
+    @_retry_transient
+    def update_redacted_bulk(self, items):
+        """Set the redacted flag for many files in one round trip per batch.
+
+        items is a list of (internal_filename, is_redacted) tuples; each
+        UPDATE_BATCH_SIZE slice becomes a single CASE-expression UPDATE.
+        """
+        records_by_filename = self.get_image_records_by_internal_filenames(
+            internal_filename for internal_filename, _ in items)
+
+        for start in range(0, len(items), UPDATE_BATCH_SIZE):
+            chunk = items[start:start + UPDATE_BATCH_SIZE]
+            # Repeating the CASE in the WHERE skips rows already at the
+            # target value, so redundant flag flips cost no row write, no
+            # undo log and no binlog entry. <=> rather than <> so rows
+            # whose redacted is still NULL are not skipped.
+            whens = ' '.join(['WHEN %s THEN %s'] * len(chunk))
+            sql = (f"""update images set redacted = CASE internal_filename
+                {whens}
+                END where internal_filename in ({','.join(['%s'] * len(chunk))})
+                and not (redacted <=> CASE internal_filename {whens} END)""")
+            case_params = list(itertools.chain.from_iterable(
+                (internal_filename, int(bool(is_redacted)))
+                for internal_filename, is_redacted in chunk))
+            params = list(case_params)
+            params.extend(internal_filename for internal_filename, _ in chunk)
+            params.extend(case_params)
+
+            logging.debug(f"update redacted: {sql}")
+            with self._get_connection() as cnx:
+                cursor = self._prepared_cursor(cnx, sql)
+                cursor.execute(sql, params)
+                cnx.commit()
+
+        for internal_filename, _ in items:
+            self._invalidate_record_cache_entries(
+                internal_filename, records_by_filename.get(internal_filename, []))
 
     def get_record(self, where_clause):
+        return list(self.get_record_stream(where_clause))
 
-        cursor = self.get_cursor()
+    def get_record_stream(self, where_clause):
+        """Stream records matching where_clause one dict at a time.
 
-        query = f"""SELECT id, original_filename, url, universal_url, internal_filename, collection,original_path, notes, redacted, datetime, orig_md5
-           FROM images 
+        The clause is interpolated into the statement text, so it must be
+        either empty or start with WHERE and contain no statement
+        separator; anything else is a programming error here, not input
+        validation.
+        """
+        assert where_clause == '' or where_clause.lstrip().upper().startswith('WHERE'), \
+            f"where_clause must start with WHERE: {where_clause!r}"
+        assert ';' not in where_clause, f"where_clause must be a single clause: {where_clause!r}"
+
+        query = f"""SELECT {SELECT_COLUMNS}
+           FROM images
            {where_clause}"""
 
-        cursor.execute(query)
-        record_list = []
-        for (
-                id, original_filename, url, universal_url, internal_filename, collection, original_path, notes,
-                redacted, datetime_record, orig_md5) in cursor:
-            record_list.append({'id': id,
-                                'original_filename': original_filename,
-                                'url': url,
-                                'universal_url': universal_url,
-                                'internal_filename': internal_filename,
-                                'collection': collection,
-                                'original_path': original_path,
-                                'notes': notes,
-                                'redacted': redacted,
-                                'datetime': datetime.strptime(datetime_record, TIME_FORMAT),
-                                'orig_md5': orig_md5
-                                })
-
-        cursor.close()
-        return record_list
+        with self._get_connection() as cnx:
+            # Unbuffered cursor: stream the scan instead of materializing it.
+            with closing(cnx.cursor(buffered=False)) as cursor:
+                cursor.execute(query)
+                while True:
+                    rows = cursor.fetchmany(FETCH_CHUNK_SIZE)
+                    if not rows:
+                        break
+                    # The datetime column comes back as a native datetime
+                    # object; serializers that need a string can format it
+                    # themselves.
+                    for row in rows:
+                        yield ImageRow._make(row).to_dict()
 
     def get_image_record_by_internal_filename(self, internal_filename):
-        cursor = self.get_cursor()
-
-        query = f"""SELECT id, original_filename, url, universal_url, internal_filename, collection,original_path, notes, redacted, datetime, orig_md5
-           FROM images 
-           WHERE internal_filename = '{internal_filename}'"""
-
-        cursor.execute(query)
-        record_list = []
-        for (id,
-             original_filename,
-             url,
-             universal_url,
-             internal_filename,
-             collection,
-             original_path,
-             notes,
-             redacted,
-             datetime_record,
-             orig_md5) in cursor:
-            record_list.append({'id': id,
-                                'original_filename': original_filename,
-                                'url': url,
-                                'universal_url': universal_url,
-                                'internal_filename': internal_filename,
-                                'collection': collection,
-                                'original_path': original_path,
-                                'notes': notes,
-                                'redacted': redacted,
-                                'datetime': datetime_record.strftime(TIME_FORMAT),
-                                'orig_md5': orig_md5
-                                })
-
-        cursor.close()
-        return record_list
+        cache_key = ('internal_filename', internal_filename)
+        with _lookup_cache_lock:
+            cached = _lookup_cache.get(cache_key)
+        if cached is not None:
+            self.log(f"Lookup cache hit: {cache_key}")
+            return [row.to_dict() for row in cached]
+
+        query = SELECT_BY_INTERNAL_FILENAME_SQL
+
+        with self._get_connection() as cnx:
+            cursor = self._prepared_cursor(cnx, query)
+            cursor.execute(query, (internal_filename,))
+            row_list = _fetch_rows(cursor)
+        with _lookup_cache_lock:
+            _lookup_cache[cache_key] = row_list
+        return [row.to_dict() for row in row_list]
+
+    def get_image_records_by_internal_filenames(self, internal_filenames):
+        """Look up many internal filenames in one IN (...) query per batch.
+
+        Returns a dict mapping each found internal filename to its list of
+        records, so callers looping over filenames pay one round trip per
+        BULK_INSERT_BATCH_SIZE names instead of one per name.
+        """
+        records_by_filename = {}
+        internal_filenames = list(internal_filenames)
+        for start in range(0, len(internal_filenames), BULK_INSERT_BATCH_SIZE):
+            batch = internal_filenames[start:start + BULK_INSERT_BATCH_SIZE]
+            placeholders = ",".join(["%s"] * len(batch))
+
+            query = f"""SELECT {SELECT_COLUMNS}
+               FROM images
+               WHERE internal_filename IN ({placeholders})"""
+
+            with self._get_connection() as cnx, closing(cnx.cursor(buffered=False)) as cursor:
+                cursor.execute(query, batch)
+                for row in _fetch_rows(cursor):
+                    records_by_filename.setdefault(row.internal_filename, []).append(row.to_dict())
+        return records_by_filename
+
+    def _build_pattern_query(self, pattern, column, exact, collection):
+        try:
+            query = PATTERN_QUERIES[(column, bool(exact), collection is not None)]
+        except KeyError:
+            # column is interpolated into SQL text when the statements are
+            # built, so anything outside the precompiled set is rejected.
+            raise ValueError(f"Unsupported search column: {column}")
+        if not exact and column in FULLTEXT_COLUMNS:
+            if _fulltext_available:
+                # Boolean-mode prefix match against the inverted index.
+                pattern = _boolean_mode_term(pattern)
+            else:
+                query = PATTERN_LIKE_QUERIES[(column, collection is not None)]
+        params = (pattern,) if collection is None else (pattern, collection)
+        return query, params
+
+    def _get_pattern_rows(self, pattern, column, exact, collection):
+        """ImageRow list for a pattern search, via the pattern cache.
+
+        Callers materialize dicts with to_dict() per call; only the
+        immutable rows are ever cached or shared.
+        """
+        cache_key = (pattern, column, bool(exact), collection)
+        query, params = self._build_pattern_query(pattern, column, exact, collection)
+        with _lookup_cache_lock:
+            cached = _pattern_cache.get(cache_key)
+        if cached is not None:
+            self.log(f"Pattern cache hit: {cache_key}")
+            return cached
+        self.log(f"Query get_image_record_by_{column}: {query} params: {params}")
+
+        try:
+            with self._get_connection() as cnx:
+                cursor = self._prepared_cursor(cnx, query)
+                cursor.execute(query, params)
+                row_list = _fetch_rows(cursor)
+        except mysql.connector.Error as err:
+            if err.errno != errorcode.ER_FT_MATCHING_KEY_NOT_FOUND:
+                raise
+            _note_fulltext_missing()
+            query, params = self._build_pattern_query(pattern, column, exact, collection)
+            with self._get_connection() as cnx:
+                cursor = self._prepared_cursor(cnx, query)
+                cursor.execute(query, params)
+                row_list = _fetch_rows(cursor)
+        if row_list:
+            self.log(f"Found at least one record: {row_list[-1]}")
+        with _lookup_cache_lock:
+            _pattern_cache[cache_key] = row_list
+        return row_list
 
     def get_image_record_by_pattern(self, pattern, column, exact, collection):
-        cursor = self.get_cursor()
-        if exact:
-            query = f"""SELECT id, original_filename, url, universal_url, internal_filename, collection,original_path, notes, redacted, datetime, orig_md5
-            FROM images 
-            WHERE {column} = '{pattern}'"""
-        else:
-            query = f"""SELECT id, original_filename, url, universal_url, internal_filename, collection,original_path, notes, redacted, datetime, orig_md5
-            FROM images 
-            WHERE {column} LIKE '{pattern}'"""
-        if collection is not None:
-            query += f""" AND collection = '{collection}'"""
-        self.log(f"Query get_image_record_by_{column}: {query}")
-
-        cursor.execute(query)
-        record_list = []
-        for (
-                id, original_filename, url, universal_url, internal_filename, collection, original_path, notes,
-                redacted, datetime_record, orig_md5) in cursor:
-            record_list.append({'id': id,
-                                'original_filename': original_filename,
-                                'url': url,
-                                'universal_url': universal_url,
-                                'internal_filename': internal_filename,
-                                'collection': collection,
-                                'original_path': original_path,
-                                'notes': notes,
-                                'redacted': redacted,
-                                'datetime': datetime_record,
-                                'orig_md5': orig_md5
-                                })
-            self.log(f"Found at least one record: {record_list[-1]}")
-
-        cursor.close()
-        return record_list
+        # to_dict() gives each caller fresh dicts, so cached rows
+        # cannot be mutated from outside.
+        return [row.to_dict() for row in
+                self._get_pattern_rows(pattern, column, exact, collection)]
+
+    def get_image_record_by_pattern_iter(self, pattern, column, exact, collection):
+        """Stream matching records one at a time instead of building a list.
+
+        Holds this thread's connection for the duration of iteration and
+        caps resident memory at one fetchmany chunk, so callers that can
+        consume incrementally should prefer this over the list variant for
+        wide LIKE scans. Results are not cached.
+        """
+        query, params = self._build_pattern_query(pattern, column, exact, collection)
+        self.log(f"Query (iter) get_image_record_by_{column}: {query} params: {params}")
+
+        with self._get_connection() as cnx:
+            # A dedicated unbuffered cursor: the shared prepared cursors
+            # must always be fully drained, which an abandoned generator
+            # cannot guarantee.
+            with closing(cnx.cursor(buffered=False)) as cursor:
+                try:
+                    cursor.execute(query, params)
+                except mysql.connector.Error as err:
+                    if err.errno != errorcode.ER_FT_MATCHING_KEY_NOT_FOUND:
+                        raise
+                    _note_fulltext_missing()
+                    query, params = self._build_pattern_query(
+                        pattern, column, exact, collection)
+                    cursor.execute(query, params)
+                while True:
+                    rows = cursor.fetchmany(FETCH_CHUNK_SIZE)
+                    if not rows:
+                        break
+                    for row in rows:
+                        yield ImageRow._make(row).to_dict()
 
     def get_image_record_by_original_path(self, original_path, exact, collection):
         record_list = self.get_image_record_by_pattern(original_path, 'original_path', exact, collection)
@@ -274,35 +716,71 @@ class ImageDb():
         return record_list
 
     def get_image_record_by_original_image_md5(self, md5, collection):
-        record_list = self.get_image_record_by_pattern(md5, 'orig_md5', True, collection)
-        return record_list
+        cache_key = ('orig_md5', md5, collection)
+        with _lookup_cache_lock:
+            cached = _lookup_cache.get(cache_key)
+        if cached is not None:
+            self.log(f"Lookup cache hit: {cache_key}")
+            return [row.to_dict() for row in cached]
+
+        row_list = self._get_pattern_rows(md5, 'orig_md5', True, collection)
+        with _lookup_cache_lock:
+            _lookup_cache[cache_key] = row_list
+        return [row.to_dict() for row in row_list]
+
+    def _invalidate_lookup_cache(self, internal_filename, orig_md5=None, collection=None):
+        """Drop cache entries touched by a mutation of the given row.
+
+        Multi-writer deployments would need cross-process invalidation
+        (e.g. pub/sub); here the TTL covers that case.
+        """
+        with _lookup_cache_lock:
+            _lookup_cache.pop(('internal_filename', internal_filename), None)
+            if orig_md5 is not None:
+                _lookup_cache.pop(('orig_md5', orig_md5, None), None)
+                _lookup_cache.pop(('orig_md5', orig_md5, collection), None)
+            _pattern_cache.clear()
+
+    def _invalidate_record_cache_entries(self, internal_filename, records):
+        if not records:
+            self._invalidate_lookup_cache(internal_filename)
+        for record in records:
+            self._invalidate_lookup_cache(internal_filename,
+                                          orig_md5=record['orig_md5'],
+                                          collection=record['collection'])
 
     def delete_image_record(self, internal_filename):
-        cursor = self.get_cursor()
+        records = self.get_image_record_by_internal_filename(internal_filename)
 
-        delete_image = (f"""delete from images where internal_filename='{internal_filename}' """)
+        delete_image = DELETE_BY_INTERNAL_FILENAME_SQL
 
         self.log(f"deleting image record. SQL: {delete_image}")
-        cursor.execute(delete_image)
-        self.cnx.commit()
-        cursor.close()
+        with self._get_connection() as cnx:
+            cursor = self._prepared_cursor(cnx, delete_image)
+            cursor.execute(delete_image, (internal_filename,))
+            cnx.commit()
+        self._invalidate_record_cache_entries(internal_filename, records)
 
     def execute(self, sql):
-        cursor = self.get_cursor()
         logging.debug(f"SQL: {sql}")
-        cursor.execute(sql)
-        self.cnx.commit()
-        cursor.close()
+        with self._get_connection() as cnx, closing(cnx.cursor(buffered=True)) as cursor:
+            cursor.execute(sql)
+            cnx.commit()
+        # Arbitrary SQL may have touched anything; drop both caches.
+        with _lookup_cache_lock:
+            _lookup_cache.clear()
+            _pattern_cache.clear()
 
     def get_collection_list(self):
-        cursor = self.get_cursor()
-
-        query = f"""select collection from collection"""
-
-        cursor.execute(query)
-        collection_list = []
-        for (collection) in cursor:
-            collection_list.append(collection)
+        query = COLLECTION_LIST_SQL
+
+        with self._get_connection() as cnx, closing(cnx.cursor(buffered=False)) as cursor:
+            # Unbuffered + immediate fetchall: one copy of the (tiny) result
+            # set instead of the buffered cursor's two.
+            cursor.execute(query)
+            # Each row is a 1-tuple; unwrap it so callers get plain strings.
+            collection_list = [row[0] for row in cursor.fetchall()]
+        return collection_list
     #
     #  not used 4/10/23 - left for referenece for now
     #
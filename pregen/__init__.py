@@ -0,0 +1,7 @@
+# Thumbnail pre-generation tooling for the web asset store.
+#
+# Walks the asset storage (S3 or the local attachment tree), records what
+# it finds in a manifest file, generates any missing thumbnails, and
+# reports on coverage. Run via `python -m pregen.cli`.
+
+__version__ = "0.1.0"
@@ -0,0 +1,219 @@
+"""Command-line entry point: scan, generate and report subcommands."""
+
+import argparse
+import functools
+import logging
+import sys
+
+from pregen.config import LocalConfig, S3Config
+from pregen.generator import Generator
+from pregen.manifest import Manifest
+from pregen.progress import GenerationProgress
+from pregen.reporter import Reporter
+from pregen.s3_client import LocalClient, S3Client
+from pregen.scan_cache import ScanCache
+from pregen.scanner import Scanner
+from pregen.thumbnail_generator import ThumbnailGenerator
+
+
+@functools.lru_cache(maxsize=2)
+def setup_logging(verbose):
+    # Memoized: each subcommand calls this on entry, and scripted
+    # back-to-back invocations in one process shouldn't re-walk the
+    # handler list or reset library logger levels.
+    logging.basicConfig(
+        level=logging.DEBUG if verbose else logging.INFO,
+        format='%(asctime)s %(name)s %(levelname)s %(message)s')
+    logging.getLogger('boto3').setLevel(logging.WARNING)
+    logging.getLogger('botocore').setLevel(logging.WARNING)
+    logging.getLogger('urllib3').setLevel(logging.WARNING)
+
+
+def add_storage_arguments(parser):
+    parser.add_argument('--s3-endpoint', help="S3 endpoint URL")
+    parser.add_argument('--s3-bucket', help="S3 bucket name")
+    parser.add_argument('--s3-prefix', default='', help="key prefix inside the bucket")
+    parser.add_argument('--s3-access-key', help="S3 access key (or PREGEN_S3_ACCESS_KEY)")
+    parser.add_argument('--s3-secret-key', help="S3 secret key (or PREGEN_S3_SECRET_KEY)")
+    parser.add_argument('--local-root', help="local attachment tree root (instead of S3)")
+    parser.add_argument('--list-workers', type=int, default=8,
+                        help="concurrent S3 LIST paginators during enumeration")
+    parser.add_argument('--scan-workers', type=int, default=8,
+                        help="concurrent per-collection walkers for local storage")
+    parser.add_argument('--cache', dest='cache', action='store_true', default=True,
+                        help="reuse unchanged records from the scan cache (default)")
+    parser.add_argument('--no-cache', dest='cache', action='store_false',
+                        help="ignore and do not update the scan cache")
+    parser.add_argument('--cache-dir', help="scan cache directory (default ~/.cache/pregen)")
+
+
+def get_s3_config(args):
+    # argparse defines every declared option, so plain dict access on
+    # vars(args) replaces the per-option getattr walks.
+    a = vars(args)
+    env = S3Config.from_env()
+    return S3Config(endpoint=a.get('s3_endpoint') or env.endpoint,
+                    bucket=a.get('s3_bucket') or env.bucket,
+                    prefix=a.get('s3_prefix') or env.prefix,
+                    access_key=a.get('s3_access_key') or env.access_key,
+                    secret_key=a.get('s3_secret_key') or env.secret_key)
+
+
+def get_local_config(args):
+    return LocalConfig(root=vars(args).get('local_root') or '.')
+
+
+def make_client(args):
+    a = vars(args)
+    if a.get('local_root'):
+        return LocalClient(get_local_config(args),
+                           scan_workers=a.get('scan_workers', 8))
+    return S3Client(get_s3_config(args),
+                    list_workers=a.get('list_workers', 8))
+
+
+def create_parser():
+    parser = argparse.ArgumentParser(
+        prog='pregen', description="Pre-generate asset-store thumbnails")
+    parser.add_argument('--verbose', action='store_true', help="debug logging")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    scan_parser = subparsers.add_parser('scan', help="scan storage into a manifest")
+    add_storage_arguments(scan_parser)
+    scan_parser.add_argument('--output', default='manifest.msgpack',
+                             help="manifest path (.msgpack/.pb = binary, else JSON)")
+    scan_parser.add_argument('--collection', action='append',
+                             help="restrict to a collection (repeatable)")
+    scan_parser.add_argument('--scale', type=int, action='append',
+                             help="thumbnail scale(s) to probe for")
+
+    gen_parser = subparsers.add_parser('generate', help="generate missing thumbnails")
+    add_storage_arguments(gen_parser)
+    gen_parser.add_argument('--manifest', default='manifest.msgpack',
+                            help="manifest path (scan's default output)")
+    gen_parser.add_argument('--collection', action='append',
+                            help="restrict to a collection (repeatable)")
+    gen_parser.add_argument('--scale', type=int, default=200, help="thumbnail bound, px")
+    gen_parser.add_argument('--workers', type=int, default=8,
+                            help="concurrent download/resize/upload workers")
+    gen_parser.add_argument('--small-threshold-mb', type=float,
+                            help="split work into small/large lanes at this original size")
+    gen_parser.add_argument('--small-workers', type=int, default=16,
+                            help="workers for the small-image lane")
+    gen_parser.add_argument('--large-workers', type=int, default=4,
+                            help="workers for the large-image lane")
+    gen_parser.add_argument('--jpeg-quality', type=int, default=82,
+                            help="JPEG quality for generated thumbnails")
+    gen_parser.add_argument('--cadence', type=float, default=0.0,
+                            help="seconds to pause between submitting records")
+    gen_parser.add_argument('--limit', type=int, help="stop after this many records")
+    gen_parser.add_argument('--resume-from', help="skip records before this filename")
+    gen_parser.add_argument('--verify-existing', action='store_true',
+                            help="re-list thumbnails in storage and skip any "
+                                 "the manifest missed")
+    gen_parser.add_argument('--dry-run', action='store_true',
+                            help="report what would be generated, write nothing")
+    gen_parser.add_argument('--show-files', action='store_true',
+                            help="print each file as it is processed")
+
+    report_parser = subparsers.add_parser('report', help="report on a manifest")
+    report_parser.add_argument('--manifest', default='manifest.msgpack',
+                               help="manifest path (scan's default output)")
+    report_parser.add_argument('--collection', action='append',
+                               help="restrict to a collection (repeatable)")
+    report_parser.add_argument('--report-type', default='summary',
+                               choices=('summary', 'detailed', 'sizes', 'plan', 'missing'))
+    report_parser.add_argument('--limit', type=int, default=50,
+                               help="rows to show for the missing-files report")
+    return parser
+
+
+def cmd_scan(args):
+    setup_logging(args.verbose)
+    client = make_client(args)
+    a = vars(args)
+    manifest = Manifest(
+        storage_type='local' if a.get('local_root') else 's3',
+        s3_endpoint=a.get('s3_endpoint'),
+        s3_bucket=a.get('s3_bucket'),
+        s3_prefix=a.get('s3_prefix'),
+        local_root=a.get('local_root'))
+    cache = ScanCache(cache_dir=args.cache_dir) if args.cache else None
+    scanner = Scanner(client, scales=args.scale or (200,), cache=cache)
+    scanner.scan(manifest, collections=args.collection)
+    manifest.save(args.output)
+    logging.info(f"Wrote manifest to {args.output}")
+    return 0
+
+
+def cmd_generate(args):
+    setup_logging(args.verbose)
+    manifest = Manifest.load(args.manifest)
+    logging.info(f"Loaded manifest: {manifest.total_images:,} records")
+    a = vars(args)
+    if a.get('local_root') or manifest.storage_type == 'local':
+        client = LocalClient(LocalConfig(
+            root=a.get('local_root') or manifest.local_root or '.'))
+    else:
+        env = S3Config.from_env()
+        client = S3Client(S3Config(
+            endpoint=a.get('s3_endpoint') or manifest.s3_endpoint,
+            bucket=a.get('s3_bucket') or manifest.s3_bucket,
+            prefix=a.get('s3_prefix') or manifest.s3_prefix or '',
+            access_key=a.get('s3_access_key') or env.access_key,
+            secret_key=a.get('s3_secret_key') or env.secret_key),
+            list_workers=a.get('list_workers', 8))
+    progress = GenerationProgress(show_files=args.show_files)
+    small_threshold = None
+    if a.get('small_threshold_mb'):
+        small_threshold = int(a['small_threshold_mb'] * 1024 * 1024)
+    thumb_gen = ThumbnailGenerator(jpeg_quality=args.jpeg_quality)
+    generator = Generator(client, thumb_gen=thumb_gen,
+                          cadence=args.cadence, workers=args.workers,
+                          small_threshold=small_threshold,
+                          small_workers=args.small_workers,
+                          large_workers=args.large_workers,
+                          dry_run=args.dry_run, progress=progress)
+    stats = generator.generate_from_manifest(manifest, scale=args.scale,
+                                             collections=args.collection,
+                                             resume_from=args.resume_from,
+                                             limit=args.limit,
+                                             verify_existing=args.verify_existing)
+    logging.info(f"Done: {stats.processed:,} generated, {stats.skipped:,} skipped, "
+                 f"{stats.errors:,} errors")
+    return 1 if stats.errors else 0
+
+
+def cmd_report(args):
+    setup_logging(args.verbose)
+    manifest = Manifest.load(args.manifest)
+    reporter = Reporter()
+    if args.report_type == 'summary':
+        reporter.report_summary(manifest)
+    elif args.report_type == 'detailed':
+        reporter.report_detailed(manifest, collections=args.collection)
+    elif args.report_type == 'sizes':
+        reporter.report_thumbnail_sizes(manifest, collections=args.collection)
+    elif args.report_type == 'plan':
+        reporter.report_action_plan(manifest, collections=args.collection)
+    elif args.report_type == 'missing':
+        reporter.report_missing_files(manifest, collections=args.collection,
+                                      limit=args.limit)
+    return 0
+
+
+DISPATCH = {
+    'scan': cmd_scan,
+    'generate': cmd_generate,
+    'report': cmd_report,
+}
+
+
+def main(argv=None):
+    parser = create_parser()
+    parsed_args = parser.parse_args(argv)
+    return DISPATCH[parsed_args.command](parsed_args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
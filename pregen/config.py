@@ -0,0 +1,39 @@
+"""Storage configuration for the pregen tools."""
+
+import functools
+import os
+from dataclasses import dataclass
+from typing import Optional
+
+
+@dataclass
+class S3Config:
+    """Connection details for an S3-compatible asset store."""
+    endpoint: Optional[str] = None
+    bucket: Optional[str] = None
+    prefix: str = ''
+    access_key: Optional[str] = None
+    secret_key: Optional[str] = None
+
+    @classmethod
+    def from_env(cls):
+        """Environment-derived config; read once and cached for the run."""
+        return cls._from_env_cached()
+
+    @classmethod
+    @functools.lru_cache(maxsize=1)
+    def _from_env_cached(cls):
+        return cls(endpoint=os.environ.get('PREGEN_S3_ENDPOINT'),
+                   bucket=os.environ.get('PREGEN_S3_BUCKET'),
+                   prefix=os.environ.get('PREGEN_S3_PREFIX', ''),
+                   access_key=os.environ.get('PREGEN_S3_ACCESS_KEY')
+                   or os.environ.get('AWS_ACCESS_KEY_ID'),
+                   secret_key=os.environ.get('PREGEN_S3_SECRET_KEY')
+                   or os.environ.get('AWS_SECRET_ACCESS_KEY'))
+
+
+@dataclass
+class LocalConfig:
+    """Location of a local attachment tree (settings.BASE_DIR layout)."""
+    root: str
+    prefix: str = ''
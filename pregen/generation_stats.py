@@ -0,0 +1,104 @@
+"""Counters for one generate run."""
+
+import threading
+import time
+from array import array
+from collections import deque
+
+# Indexes into the counter array.
+_PROCESSED, _SKIPPED, _ERRORS, _BYTES, _TOTAL = range(5)
+
+
+class GenerationStats:
+    """Counts processed/skipped/errored records during generation.
+
+    Counters live in one array.array('q') and are bumped through methods
+    holding a lock for just the increment, so many workers can update
+    them without mutex-guarding every attribute separately. Reads go
+    straight to the array: aligned 64-bit loads are atomic under the
+    GIL, so progress reporting never takes the lock.
+
+    start_time is a monotonic timestamp: cheaper to read than wall-clock
+    time and immune to clock adjustments mid-run.
+    """
+
+    def __init__(self, total_to_process=0):
+        self._counters = array('q', [0, 0, 0, 0, total_to_process])
+        self._lock = threading.Lock()
+        # Bounded so a pathological run can't grow error memory forever.
+        self.error_details = deque(maxlen=1000)
+        self.start_time = time.monotonic()
+
+    def add_processed(self, thumb_bytes):
+        with self._lock:
+            self._counters[_PROCESSED] += 1
+            self._counters[_BYTES] += thumb_bytes
+
+    def add_skipped(self):
+        with self._lock:
+            self._counters[_SKIPPED] += 1
+
+    def record_error(self, filename, error):
+        with self._lock:
+            self._counters[_ERRORS] += 1
+            self.error_details.append((filename, str(error)))
+
+    @property
+    def processed(self):
+        return self._counters[_PROCESSED]
+
+    @property
+    def skipped(self):
+        return self._counters[_SKIPPED]
+
+    @property
+    def errors(self):
+        return self._counters[_ERRORS]
+
+    @property
+    def bytes_generated(self):
+        return self._counters[_BYTES]
+
+    @property
+    def total_to_process(self):
+        return self._counters[_TOTAL]
+
+    @total_to_process.setter
+    def total_to_process(self, value):
+        self._counters[_TOTAL] = value
+
+    def snapshot(self):
+        """Return (completed, remaining, rate_per_minute, eta_seconds).
+
+        One clock read and one pass over the counters, so per-interval
+        progress callbacks don't recompute the same derivations four
+        times through separate properties.
+        """
+        counters = self._counters
+        completed = counters[_PROCESSED] + counters[_SKIPPED] + counters[_ERRORS]
+        remaining = max(0, counters[_TOTAL] - completed)
+        elapsed = time.monotonic() - self.start_time
+        rate = completed / elapsed * 60.0 if elapsed > 0 else 0.0
+        eta = remaining / rate * 60.0 if rate > 0 else 0.0
+        return completed, remaining, rate, eta
+
+    @property
+    def completed_count(self):
+        counters = self._counters
+        return counters[_PROCESSED] + counters[_SKIPPED] + counters[_ERRORS]
+
+    @property
+    def remaining_count(self):
+        return self.snapshot()[1]
+
+    @property
+    def elapsed_seconds(self):
+        return time.monotonic() - self.start_time
+
+    @property
+    def rate_per_minute(self):
+        return self.snapshot()[2]
+
+    @property
+    def estimated_remaining_seconds(self):
+        return self.snapshot()[3]
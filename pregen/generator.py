@@ -0,0 +1,270 @@
+"""Generates missing thumbnails from a scan manifest."""
+
+import logging
+import threading
+import time
+from bisect import bisect_left
+from concurrent.futures import (FIRST_COMPLETED, ThreadPoolExecutor,
+                                as_completed, wait)
+from itertools import islice
+
+from pregen.generation_stats import GenerationStats
+from pregen.progress import GenerationProgress
+from pregen.thumbnail_generator import ThumbnailGenerator
+
+logger = logging.getLogger('pregen.generate')
+
+# Upload Content-Type per thumbnail extension; keys follow the server's
+# naming, so anything outside this set was encoded as JPEG anyway.
+_CONTENT_TYPES = {'jpg': 'image/jpeg', 'jpeg': 'image/jpeg',
+                  'png': 'image/png', 'gif': 'image/gif'}
+
+
+class TokenBucket:
+    """Caps aggregate request rate across all worker threads.
+
+    A per-worker sleep between submissions caps throughput at one record
+    per cadence regardless of worker count; a shared bucket enforces the
+    rate where it matters - storage requests per second - while letting
+    bursts up to `capacity` through unthrottled.
+    """
+
+    def __init__(self, rate, capacity=1.0):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.last_refill = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Take one token, sleeping outside the lock if over rate."""
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity,
+                              self.tokens + (now - self.last_refill) * self.rate)
+            self.last_refill = now
+            self.tokens -= 1.0
+            wait = -self.tokens / self.rate if self.tokens < 0 else 0.0
+        if wait > 0:
+            time.sleep(wait)
+
+
+class Generator:
+    """Downloads originals, renders thumbnails and stores them back.
+
+    Each record is an independent download/resize/upload task dominated by
+    storage round trips, so records are spread over a bounded thread pool;
+    the in-flight count is capped so originals are not buffered faster
+    than the workers drain them.
+    """
+
+    def __init__(self, client, thumb_gen=None, cadence=0.0, workers=8,
+                 small_threshold=None, small_workers=16, large_workers=4,
+                 dry_run=False, progress=None):
+        self.client = client
+        self.thumb_gen = thumb_gen or ThumbnailGenerator()
+        self.cadence = cadence
+        self.workers = workers
+        # When small_threshold is set, records are split into a small-image
+        # fast lane and a large-image lane with separate worker pools.
+        self.small_threshold = small_threshold
+        self.small_workers = small_workers
+        self.large_workers = large_workers
+        self.dry_run = dry_run
+        self.progress = progress or GenerationProgress()
+        self.stats = GenerationStats()
+        self._stop_requested = False
+        # One bucket shared by every lane, so cadence bounds the overall
+        # storage request rate instead of sleeping each worker.
+        self._bucket = (TokenBucket(rate=1.0 / cadence,
+                                    capacity=max(1.0, small_workers + large_workers
+                                                 if small_threshold else workers))
+                        if cadence else None)
+
+    def request_stop(self):
+        """Stop submitting new records; in-flight work finishes."""
+        self._stop_requested = True
+
+    @staticmethod
+    def _iter_records_to_process(candidates, mask, collection_set):
+        for record, has_thumb in zip(candidates, mask):
+            if has_thumb:
+                continue
+            if collection_set is not None and record.collection not in collection_set:
+                continue
+            yield record
+
+    def _list_existing_thumbnails(self, collections=None):
+        """Set of every thumbnail key currently in storage.
+
+        One LIST page covers up to 1000 keys, so refreshing existence
+        for the whole store costs N/1000 requests instead of one HEAD
+        per candidate record.
+        """
+        existing = set()
+        for collection in collections or (None,):
+            existing.update(
+                key for key, _size, _modified
+                in self.client.list_thumbnails(collection=collection))
+        return existing
+
+    def generate_from_manifest(self, manifest, scale=200, collections=None,
+                               resume_from=None, limit=None,
+                               verify_existing=False):
+        if resume_from is None:
+            candidates = manifest.records
+        else:
+            # Jump straight to the resume point instead of comparing
+            # filenames record by record; records past it come back in
+            # filename order, which is also what --resume-from implies.
+            sorted_records, filenames = manifest.records_sorted_by_filename()
+            candidates = sorted_records[bisect_left(filenames, resume_from):]
+        # O(1) membership per record; the CLI hands collections over as
+        # a list, which would make this a string scan per record.
+        collection_set = frozenset(collections) if collections else None
+        # One pass builds the has-thumbnail byte column; pending-work
+        # counting and the per-record filter read flags from it instead
+        # of calling has_thumbnail per record.
+        mask = manifest.build_has_scale_mask(scale, candidates)
+        # Against a stale manifest, re-LIST the thumbnail tree and drop
+        # candidates whose thumbnail already landed since the scan - a
+        # handful of LIST pages instead of a redundant generate (or a
+        # HEAD probe) per record.
+        existing = (self._list_existing_thumbnails(collections)
+                    if verify_existing else None)
+
+        def pending():
+            records = self._iter_records_to_process(candidates, mask, collection_set)
+            if existing is None:
+                return records
+            return (record for record in records
+                    if record.get_thumbnail_key(scale) not in existing)
+
+        if existing is not None:
+            total = sum(1 for _ in pending())
+        elif collection_set is None:
+            # sum() over the byte column runs in C.
+            total = len(mask) - sum(mask)
+        else:
+            total = sum(1 for record in pending())
+        if limit is not None:
+            total = min(total, limit)
+        # Records stream straight into the lane rather than being
+        # buffered into a list first, so the first thumbnail starts
+        # immediately and memory stays flat on huge manifests.
+        records_to_process = pending()
+        if limit is not None:
+            records_to_process = islice(records_to_process, limit)
+        self.stats.total_to_process = total
+        logger.info(f"Generating {total:,} thumbnails at scale {scale}")
+
+        if self.small_threshold is None:
+            self._run_lane(records_to_process, self.workers, scale)
+            return self.stats
+
+        # Two lanes so a burst of huge TIFFs can't head-of-line block the
+        # thousands of small JPEGs queued behind them: small images get
+        # the wider pool, large ones their own narrow one. The size
+        # partition needs the full set up front, so this path buffers.
+        records_to_process = list(records_to_process)
+        small = [r for r in records_to_process if r.original_size < self.small_threshold]
+        large = [r for r in records_to_process if r.original_size >= self.small_threshold]
+        logger.info(f"Lanes: {len(small):,} small (<{self.small_threshold:,} bytes, "
+                    f"{self.small_workers} workers), {len(large):,} large "
+                    f"({self.large_workers} workers)")
+        lanes = []
+        for records, workers in ((small, self.small_workers), (large, self.large_workers)):
+            if not records:
+                continue
+            lane = threading.Thread(target=self._run_lane,
+                                    args=(records, workers, scale))
+            lane.start()
+            lanes.append(lane)
+        for lane in lanes:
+            lane.join()
+        return self.stats
+
+    def _run_lane(self, records, workers, scale):
+        """Drain one list of records through its own bounded thread pool."""
+        # Cap queued-but-unstarted work so a fast submission loop can't
+        # buffer thousands of records (and their downloads) ahead of the
+        # workers.
+        in_flight = threading.Semaphore(workers * 2)
+
+        def run_one(record):
+            try:
+                return self._process_record(record, scale)
+            finally:
+                in_flight.release()
+
+        futures = []
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            for record in records:
+                if self._stop_requested:
+                    logger.info("Stop requested; draining in-flight work")
+                    break
+                in_flight.acquire()
+                futures.append(pool.submit(run_one, record))
+            for future in as_completed(futures):
+                future.result()
+
+    def _process_record(self, record, scale):
+        thumb_key = record.get_thumbnail_key(scale)
+        if self.dry_run:
+            self.stats.add_skipped()
+            self.progress.on_dry_run(record.filename)
+            self.progress.on_progress_update(self.stats)
+            return
+
+        try:
+            if self._bucket is not None:
+                self._bucket.acquire()
+            # Stream the original straight into the decoder instead of
+            # buffering it as bytes first; the thumbnail stays in its
+            # encode buffer all the way to upload.
+            stream = self.client.open_object_stream(record.original_key)
+            try:
+                # rpartition beats splitext+lower here and the result
+                # selects a precompiled save-parameter set.
+                ext = thumb_key.rpartition('.')[2].lower()
+                thumb_buffer = self.thumb_gen.generate(stream, scale, ext=ext)
+            finally:
+                stream.close()
+            thumb_bytes = thumb_buffer.tell()
+            thumb_buffer.seek(0)
+            self.client.upload_object(
+                thumb_key, thumb_buffer,
+                content_type=_CONTENT_TYPES.get(ext, 'image/jpeg'))
+        except Exception as err:
+            logger.debug(f"Failed on {record.original_key}: {err}")
+            self.stats.record_error(record.filename, err)
+        else:
+            self.stats.add_processed(thumb_bytes)
+            self.progress.on_file_processed(record.filename, thumb_bytes)
+        self.progress.on_progress_update(self.stats)
+
+    def verify_thumbnail(self, record, scale):
+        """Check storage directly for the record's thumbnail at scale."""
+        return self.client.object_exists(record.get_thumbnail_key(scale))
+
+    def verify_thumbnails_batch(self, records, scale, max_workers=64):
+        """Yield (record, exists) pairs, probing storage concurrently.
+
+        Each probe is one fixed-latency HEAD/stat, so throughput scales
+        with concurrency; submission is windowed so an arbitrarily large
+        record iterable never piles up more than a few hundred pending
+        futures.
+        """
+        iterator = iter(records)
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            pending = {
+                pool.submit(self.verify_thumbnail, record, scale): record
+                for record in islice(iterator, max_workers * 4)}
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    record = pending.pop(future)
+                    yield record, future.result()
+                    for refill in islice(iterator, 1):
+                        pending[pool.submit(
+                            self.verify_thumbnail, refill, scale)] = refill
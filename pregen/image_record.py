@@ -0,0 +1,99 @@
+"""Records describing one original image and its generated thumbnails."""
+
+import sys
+from dataclasses import dataclass, field
+from typing import Dict, Optional
+
+
+@dataclass
+class ThumbnailInfo:
+    """One generated thumbnail of an original, at a single scale."""
+    scale: int
+    key: str
+    size: int = 0
+    modified: Optional[str] = None
+
+    def to_dict(self):
+        # Hand-written rather than dataclasses.asdict: asdict walks the
+        # field descriptors and deep-copies recursively, which is ~20x
+        # the cost of a literal for a flat 4-field struct called once
+        # per thumbnail per serialize.
+        return {'scale': self.scale,
+                'key': self.key,
+                'size': self.size,
+                'modified': self.modified}
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(scale=int(data['scale']),
+                   key=data['key'],
+                   size=int(data.get('size', 0)),
+                   modified=data.get('modified'))
+
+
+@dataclass
+class ImageRecord:
+    """One original image in the asset store, plus its known thumbnails."""
+    filename: str
+    collection: str
+    original_key: str
+    original_size: int = 0
+    original_modified: Optional[str] = None
+    base_thumbnail_key: Optional[str] = None
+    thumbnails: Dict[int, ThumbnailInfo] = field(default_factory=dict)
+
+    # Lazily cached (root, ext) split of base_thumbnail_key; a class
+    # attribute rather than a field so it stays out of init/to_dict.
+    _thumb_root_ext = None
+
+    @property
+    def thumbnail_exists(self):
+        return len(self.thumbnails) > 0
+
+    def has_thumbnail(self, scale=None):
+        if scale is None:
+            return self.thumbnail_exists
+        return scale in self.thumbnails
+
+    def get_thumbnail(self, scale):
+        return self.thumbnails.get(scale)
+
+    def get_thumbnail_key(self, scale):
+        """Key the thumbnail for `scale` lives at (or should live at)."""
+        # Split once per record, not once per call: the generator asks
+        # for this per record per scale in its hot path.
+        cached = self._thumb_root_ext
+        if cached is None:
+            cached = self._thumb_root_ext = tuple(
+                self.base_thumbnail_key.rsplit('.', 1))
+        return f"{cached[0]}_{scale}.{cached[1]}"
+
+    def add_thumbnail(self, info):
+        self.thumbnails[info.scale] = info
+
+    def to_dict(self):
+        return {
+            'filename': self.filename,
+            'collection': self.collection,
+            'original_key': self.original_key,
+            'original_size': self.original_size,
+            'original_modified': self.original_modified,
+            'base_thumbnail_key': self.base_thumbnail_key,
+            'thumbnails': {str(scale): info.to_dict()
+                           for scale, info in self.thumbnails.items()},
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        # A manifest holds millions of records but only a handful of
+        # distinct collection names; interning collapses the duplicates
+        # the parser materialized into one shared string each.
+        record = cls(filename=data['filename'],
+                     collection=sys.intern(data['collection']),
+                     original_key=data['original_key'],
+                     original_size=int(data.get('original_size', 0)),
+                     original_modified=data.get('original_modified'),
+                     base_thumbnail_key=data.get('base_thumbnail_key'))
+        for scale_str, info_data in data.get('thumbnails', {}).items():
+            record.thumbnails[int(scale_str)] = ThumbnailInfo.from_dict(info_data)
+        return record
@@ -0,0 +1,110 @@
+"""Console progress reporting for scan and generate runs."""
+
+import logging
+import queue
+import sys
+import threading
+import time
+
+# (divisor, unit) indexed by bytes_val.bit_length() // 10, so formatting
+# is a table lookup instead of a divide-and-compare loop per call.
+_UNITS = ((1, 'B'), (1024, 'KB'), (1024 ** 2, 'MB'), (1024 ** 3, 'GB'), (1024 ** 4, 'TB'))
+
+
+class _LineWriter:
+    """Batches lines from many threads into periodic stdout writes.
+
+    A bare print() per processed file serializes the worker threads on
+    the interpreter's stdout lock and flushes per line; enqueueing the
+    string and letting one daemon thread write accumulated batches keeps
+    per-file cost to a queue put.
+    """
+
+    def __init__(self, flush_interval=0.2):
+        self.flush_interval = flush_interval
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._drain, daemon=True)
+        self._thread.start()
+
+    def write_line(self, text):
+        self._queue.put(text + '\n')
+
+    def _drain(self):
+        while True:
+            lines = [self._queue.get()]
+            deadline = time.monotonic() + self.flush_interval
+            while True:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    lines.append(self._queue.get(timeout=timeout))
+                except queue.Empty:
+                    break
+            sys.stdout.write(''.join(lines))
+            sys.stdout.flush()
+
+
+class GenerationProgress:
+    """Logs periodic progress lines (and optionally per-file detail).
+
+    Callbacks arrive from multiple generator lanes concurrently, so the
+    interval bookkeeping is lock-guarded.
+    """
+
+    def __init__(self, log_interval=100, show_files=False):
+        self.logger = logging.getLogger('pregen.generate')
+        self.log_interval = log_interval
+        self.show_files = show_files
+        self.last_logged = 0
+        self._lock = threading.Lock()
+        self._writer = _LineWriter() if show_files else None
+
+    def on_progress_update(self, stats):
+        completed = stats.completed_count
+        with self._lock:
+            if completed - self.last_logged < self.log_interval:
+                return
+            self.last_logged = completed
+        if not self.logger.isEnabledFor(logging.INFO):
+            # Skip the snapshot and string formatting entirely when INFO
+            # is filtered out (e.g. embedded callers running WARNING+).
+            return
+        completed, remaining, rate, eta = stats.snapshot()
+        self.logger.info(
+            "Progress: %s generated, %s errors (%.1f/min, ~%.0fm remaining, %s left)",
+            format(stats.processed, ','), format(stats.errors, ','),
+            rate, eta / 60, format(remaining, ','))
+
+    def on_file_processed(self, filename, thumb_size):
+        if self.show_files:
+            self._writer.write_line(f"  generated {filename} ({self._format_bytes(thumb_size)})")
+
+    def on_file_skipped(self, filename, reason):
+        if self.show_files:
+            self._writer.write_line(f"  skipped {filename}: {reason}")
+
+    def on_dry_run(self, filename):
+        if self.show_files:
+            self._writer.write_line(f"  would generate {filename}")
+
+    @staticmethod
+    def _format_bytes(bytes_val):
+        divisor, unit = _UNITS[min(4, max(0, (int(bytes_val).bit_length() - 1) // 10))]
+        return f"{bytes_val / divisor:.1f} {unit}"
+
+
+class ScannerProgress:
+    """Logs periodic progress while the scanner walks storage."""
+
+    def __init__(self, log_interval=1024):
+        self.logger = logging.getLogger('pregen.scan')
+        # Rounded up to a power of two so the per-object check is a
+        # bitwise AND rather than a modulo.
+        self._mask = (1 << max(1, log_interval - 1).bit_length()) - 1
+        self.count = 0
+
+    def on_object_seen(self, key):
+        self.count += 1
+        if self.count & self._mask == 0:
+            self.logger.info("Scanned %s objects...", format(self.count, ','))
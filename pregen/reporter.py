@@ -0,0 +1,191 @@
+"""Text reports over a scan manifest."""
+
+import io
+import sys
+from collections import defaultdict
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Dict, List, Tuple
+
+
+@dataclass
+class _ReportStats:
+    """Aggregates one pass over a manifest's records yields.
+
+    Built once and shared by every report method, so asking for several
+    reports in a row costs one record scan instead of one per report.
+    """
+    scale_count: Dict[Tuple[str, int], int] = field(default_factory=dict)
+    scale_bytes: Dict[Tuple[str, int], int] = field(default_factory=dict)
+    missing_by_collection: Dict[str, int] = field(default_factory=dict)
+    missing_bytes_by_collection: Dict[str, int] = field(default_factory=dict)
+    missing_records: List = field(default_factory=list)
+
+
+class Reporter:
+    """Prints coverage, size and action-plan reports for a manifest."""
+
+    def __init__(self, output=None):
+        self.output = output or sys.stdout
+        self._stats_cache = {}
+
+    def _print(self, text=''):
+        print(text, file=self.output)
+
+    @contextmanager
+    def _buffered(self):
+        """Collect a report's _print calls and flush them in one write.
+
+        Swapping self.output for a StringIO means the row loops pay a
+        string append per line instead of a locked (and, on ttys,
+        line-flushed) write; nesting works because an inner report just
+        flushes into the outer buffer.
+        """
+        real_output = self.output
+        self.output = io.StringIO()
+        try:
+            yield
+            real_output.write(self.output.getvalue())
+        finally:
+            self.output = real_output
+
+    @staticmethod
+    def _format_bytes(bytes_val):
+        value = float(bytes_val)
+        for unit in ('B', 'KB', 'MB', 'GB'):
+            if value < 1024.0:
+                return f"{value:.1f} {unit}"
+            value /= 1024.0
+        return f"{value:.1f} TB"
+
+    def report_summary(self, manifest):
+        with self._buffered():
+            self._print("Manifest summary")
+            self._print(f"  created:            {manifest.created_at}")
+            self._print(f"  storage:            {manifest.storage_type}")
+            self._print(f"  originals:          {manifest.total_images:,}")
+            self._print(f"  with thumbnails:    {manifest.total_with_thumbnails:,}")
+            self._print(f"  missing thumbnails: {manifest.total_missing_thumbnails:,}")
+
+    def report_detailed(self, manifest, collections=None):
+        collections_filter = frozenset(collections) if collections else None
+        with self._buffered():
+            self.report_summary(manifest)
+            self._print()
+            self._print(f"{'Collection':<30} {'Images':>10} {'Thumbs':>10} {'Missing':>10}")
+            for name in manifest.sorted_collection_names:
+                if collections_filter is not None and name not in collections_filter:
+                    continue
+                stats = manifest.collection_stats[name]
+                self._print(f"{name:<30} {stats.total_images:>10,} "
+                            f"{stats.images_with_thumbnails:>10,} "
+                            f"{stats.missing_thumbnails:>10,}")
+
+    def _get_or_build_stats(self, manifest):
+        """Build (or reuse) the one-pass aggregate over the records.
+
+        The collection filter is applied at print time against the
+        per-collection aggregates, so the same cached pass serves
+        filtered and unfiltered reports alike.
+        """
+        cache_key = (id(manifest), manifest.created_at, len(manifest.records))
+        stats = self._stats_cache.get(cache_key)
+        if stats is not None:
+            return stats
+        # Missing-work aggregation comes from the manifest's columnar
+        # view (two NumPy bincounts); only the per-scale maps still need
+        # to touch the nested thumbnail dicts record by record.
+        missing = {}
+        missing_bytes = {}
+        arrays = manifest.as_arrays()
+        for name, (count, nbytes) in arrays.missing_by_collection().items():
+            missing[name] = count
+            missing_bytes[name] = nbytes
+        missing_records = [manifest.records[i] for i in arrays.missing_indexes()]
+        scale_count = defaultdict(int)
+        scale_bytes = defaultdict(int)
+        # Hoist the attribute walks out of the per-record loop; over
+        # millions of records every repeated lookup shows up.
+        records = manifest.records
+        for record in records:
+            collection = record.collection
+            thumbnails = record.thumbnails
+            if thumbnails:
+                for scale, thumb_info in thumbnails.items():
+                    scale_count[(collection, scale)] += 1
+                    scale_bytes[(collection, scale)] += thumb_info.size
+        stats = _ReportStats(scale_count=dict(scale_count),
+                             scale_bytes=dict(scale_bytes),
+                             missing_by_collection=missing,
+                             missing_bytes_by_collection=missing_bytes,
+                             missing_records=missing_records)
+        self._stats_cache[cache_key] = stats
+        return stats
+
+    def report_thumbnail_sizes(self, manifest, collections=None):
+        stats = self._get_or_build_stats(manifest)
+        scale_count = stats.scale_count
+        scale_bytes = stats.scale_bytes
+        # frozenset membership once per entry instead of scanning the
+        # --collection list; same idiom as the generator's filter.
+        collections_filter = frozenset(collections) if collections else None
+        scales_by_collection = defaultdict(list)
+        for collection, scale in scale_count:
+            if collections_filter is not None and collection not in collections_filter:
+                continue
+            scales_by_collection[collection].append(scale)
+        # Assemble the whole report and write it once: a print() per row
+        # means a locked, possibly line-flushed write per collection and
+        # scale.
+        format_bytes = self._format_bytes
+        lines = ["Thumbnail storage by collection"]
+        for name in manifest.sorted_collection_names:
+            if name not in scales_by_collection:
+                continue
+            scales = sorted(scales_by_collection[name])
+            total_count = sum(scale_count[(name, scale)] for scale in scales)
+            total_bytes = sum(scale_bytes[(name, scale)] for scale in scales)
+            lines.append(f"\n{name}: {total_count:,} thumbnails, "
+                         f"{format_bytes(total_bytes)}")
+            for scale in scales:
+                count = scale_count[(name, scale)]
+                size = scale_bytes[(name, scale)]
+                avg = size / count if count else 0
+                lines.append(f"  @{scale:<6} {count:>10,} "
+                             f"{format_bytes(size):>12} "
+                             f"(avg {format_bytes(avg)})")
+        self.output.write('\n'.join(lines) + '\n')
+
+    def report_action_plan(self, manifest, collections=None):
+        stats = self._get_or_build_stats(manifest)
+        missing = stats.missing_by_collection
+        missing_bytes = stats.missing_bytes_by_collection
+        collections_filter = frozenset(collections) if collections else None
+        with self._buffered():
+            emit = self._print
+            emit("Action plan: thumbnails to generate")
+            for name in manifest.sorted_collection_names:
+                if name not in missing:
+                    continue
+                if collections_filter is not None and name not in collections_filter:
+                    continue
+                emit(f"  {name:<30} {missing[name]:>10,} images "
+                     f"({self._format_bytes(missing_bytes[name])} of originals)")
+
+    def report_missing_files(self, manifest, collections=None, limit=50):
+        collections_filter = frozenset(collections) if collections else None
+        # The cached stats already carry every missing record, so this
+        # only touches the missing subset (and just `limit` of it when
+        # unfiltered) instead of rescanning the whole manifest.
+        missing_records = self._get_or_build_stats(manifest).missing_records
+        if collections_filter is not None:
+            missing_records = [record for record in missing_records
+                               if record.collection in collections_filter]
+        with self._buffered():
+            emit = self._print
+            emit(f"Missing thumbnails (first {limit}):")
+            for record in missing_records[:limit]:
+                emit(f"  {record.collection}/{record.filename}")
+            remaining = len(missing_records) - limit
+            if remaining > 0:
+                emit(f"  ... and {remaining:,} more")
@@ -0,0 +1,280 @@
+"""S3 access for the pregen tools.
+
+Keys handed to callers are relative to the configured prefix, so the
+first path segment is the collection directory and the second is either
+ORIG_SEGMENT or THUMB_SEGMENT (mirroring the on-disk attachment layout).
+"""
+
+import io
+import logging
+import os
+import queue
+from concurrent.futures import ThreadPoolExecutor
+from itertools import chain
+
+import boto3
+from boto3.s3.transfer import TransferConfig
+
+# Path segments mirroring settings.ORIG_DIR / settings.THUMB_DIR.
+ORIG_SEGMENT = 'originals'
+THUMB_SEGMENT = 'thumbnails'
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.gif', '.tif', '.tiff')
+
+# JMESPath projection applied per LIST page: drops non-image keys and
+# strips each object down to the three fields we use before anything
+# reaches the result queue. ends_with has no case folding, so the
+# predicate covers lower- and upper-case extensions; the Python-side
+# endswith in _list_segment remains as the final guard.
+_LIST_PROJECTION = (
+    "Contents[?" +
+    " || ".join(f"ends_with(Key, '{ext}')"
+                for case in (str.lower, str.upper)
+                for ext in (case(e) for e in IMAGE_EXTENSIONS)) +
+    "].{Key: Key, Size: Size, LastModified: LastModified}")
+
+# Transfers above the threshold split into concurrent 8MB part requests,
+# so a single big TIFF pulls several S3 streams instead of one.
+TRANSFER_CONFIG = TransferConfig(multipart_threshold=8 * 1024 * 1024,
+                                 multipart_chunksize=8 * 1024 * 1024,
+                                 max_concurrency=10,
+                                 use_threads=True)
+
+logger = logging.getLogger('pregen.s3')
+
+
+class S3Client:
+    """Thin wrapper over boto3 for listing, fetching and storing objects."""
+
+    def __init__(self, config, list_workers=8):
+        self.config = config
+        self.bucket = config.bucket
+        self.prefix = config.prefix.strip('/')
+        self.list_workers = list_workers
+        self.client = boto3.client('s3',
+                                   endpoint_url=config.endpoint,
+                                   aws_access_key_id=config.access_key,
+                                   aws_secret_access_key=config.secret_key)
+
+    def _full_key(self, key):
+        return f"{self.prefix}/{key}" if self.prefix else key
+
+    def _relative_key(self, full_key):
+        if self.prefix and full_key.startswith(self.prefix + '/'):
+            return full_key[len(self.prefix) + 1:]
+        return full_key
+
+    def _collection_prefixes(self, segment):
+        """Full-key prefixes for every collection's segment directory."""
+        # _full_key('') is '' or 'prefix/' - already slash-terminated.
+        base = self._full_key('')
+        paginator = self.client.get_paginator('list_objects_v2')
+        prefixes = []
+        for page in paginator.paginate(Bucket=self.bucket, Prefix=base, Delimiter='/'):
+            for common in page.get('CommonPrefixes', []):
+                prefixes.append(f"{common['Prefix']}{segment}/")
+        return prefixes
+
+    def _shard_prefixes(self, prefix):
+        """Split a prefix into child prefixes plus its direct objects.
+
+        One Delimiter='/' pass discovers the immediate subdirectories
+        (the hashed attachment dirs), each of which can then be paged by
+        its own paginator; objects sitting directly under the prefix
+        come back from the same pass, so nothing is listed twice.
+        """
+        paginator = self.client.get_paginator('list_objects_v2')
+        shards, direct = [], []
+        for page in paginator.paginate(Bucket=self.bucket, Prefix=prefix,
+                                       Delimiter='/'):
+            shards.extend(p['Prefix'] for p in page.get('CommonPrefixes', []))
+            direct.extend((obj['Key'], obj['Size'],
+                           obj['LastModified'].isoformat())
+                          for obj in page.get('Contents', []))
+        return shards, direct
+
+    def list_prefix_parallel(self, prefixes, max_workers=None):
+        """Yield raw (full_key, size, modified) across prefixes concurrently.
+
+        One paginator per prefix runs in a thread pool; pages are drained
+        into a bounded queue so the listing wall-clock shrinks roughly
+        with the number of prefixes instead of serializing 1000-key pages
+        end to end.
+        """
+        prefixes = list(prefixes)
+        if not prefixes:
+            return
+        if max_workers is None:
+            max_workers = self.list_workers
+        results = queue.Queue(maxsize=10000)
+        done = object()
+
+        def drain(prefix):
+            try:
+                paginator = self.client.get_paginator('list_objects_v2')
+                pages = paginator.paginate(
+                    Bucket=self.bucket, Prefix=prefix,
+                    PaginationConfig={'PageSize': 1000})
+                # search() yields None for pages with no Contents.
+                for obj in pages.search(_LIST_PROJECTION):
+                    if obj is not None:
+                        results.put((obj['Key'], obj['Size'],
+                                     obj['LastModified'].isoformat()))
+            finally:
+                results.put(done)
+
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(prefixes))) as pool:
+            for prefix in prefixes:
+                pool.submit(drain, prefix)
+            remaining = len(prefixes)
+            while remaining:
+                item = results.get()
+                if item is done:
+                    remaining -= 1
+                else:
+                    yield item
+
+    def _list_segment(self, segment, collection=None):
+        """Yield (key, size, modified) for every image under a segment.
+
+        A requested collection becomes the LIST prefix itself, so other
+        collections' listings never cross the wire at all.
+        """
+        if collection is not None:
+            # _full_key('') is '' or 'prefix/' - already slash-terminated.
+            prefix = f"{self._full_key('')}{collection}/{segment}/"
+            # A single collection would otherwise page serially through
+            # one paginator; splitting on its hashed subdirectories
+            # gives the pool shards to list concurrently.
+            shards, direct = self._shard_prefixes(prefix)
+            listing = chain(direct, self.list_prefix_parallel(shards))
+        else:
+            listing = self.list_prefix_parallel(self._collection_prefixes(segment))
+        for full_key, size, modified in listing:
+            key = self._relative_key(full_key)
+            if not key.lower().endswith(IMAGE_EXTENSIONS):
+                continue
+            yield key, size, modified
+
+    def list_originals(self, collection=None):
+        return self._list_segment(ORIG_SEGMENT, collection)
+
+    def list_thumbnails(self, collection=None):
+        return self._list_segment(THUMB_SEGMENT, collection)
+
+    def download_object(self, key):
+        buffer = io.BytesIO()
+        self.client.download_fileobj(self.bucket, self._full_key(key), buffer,
+                                     Config=TRANSFER_CONFIG)
+        return buffer.getvalue()
+
+    def open_object_stream(self, key):
+        """Return the object's streaming body for incremental reads.
+
+        Unlike download_object this never buffers the whole original:
+        the decoder pulls from the HTTP response as it goes, so peak
+        memory per worker is the decode buffer rather than decode plus a
+        full copy of the source bytes.
+        """
+        response = self.client.get_object(Bucket=self.bucket, Key=self._full_key(key))
+        return response['Body']
+
+    def upload_object(self, key, data, content_type='image/jpeg'):
+        fileobj = io.BytesIO(data) if isinstance(data, (bytes, bytearray)) else data
+        self.client.upload_fileobj(fileobj, self.bucket, self._full_key(key),
+                                   ExtraArgs={'ContentType': content_type},
+                                   Config=TRANSFER_CONFIG)
+
+    def get_object_metadata(self, key):
+        """HEAD an object; returns {'size', 'modified'} or None if absent."""
+        try:
+            response = self.client.head_object(Bucket=self.bucket, Key=self._full_key(key))
+        except self.client.exceptions.ClientError as err:
+            if err.response['ResponseMetadata']['HTTPStatusCode'] == 404:
+                return None
+            raise
+        return {'size': response['ContentLength'],
+                'modified': response['LastModified'].isoformat()}
+
+    def object_exists(self, key):
+        return self.get_object_metadata(key) is not None
+
+
+class LocalClient:
+    """Same interface as S3Client over a local attachment tree."""
+
+    def __init__(self, config, scan_workers=8):
+        self.config = config
+        self.root = config.root.rstrip('/')
+        self.scan_workers = scan_workers
+
+    def _full_path(self, key):
+        return os.path.join(self.root, key)
+
+    def _walk_segment_dir(self, collection, segment):
+        """Collect (key, size, mtime_ns) under one collection's segment dir.
+
+        os.scandir returns each entry's type and stat in the same
+        getdents pass, so no separate os.stat call per file - the walk
+        cost matters on cold NFS asset mounts.
+        """
+        base = os.path.join(self.root, collection, segment)
+        results = []
+        if not os.path.isdir(base):
+            return results
+        stack = [base]
+        while stack:
+            with os.scandir(stack.pop()) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+                    elif entry.name.lower().endswith(IMAGE_EXTENSIONS):
+                        stat = entry.stat(follow_symlinks=False)
+                        key = os.path.relpath(entry.path, self.root).replace(os.sep, '/')
+                        results.append((key, stat.st_size, str(stat.st_mtime_ns)))
+        return results
+
+    def _list_segment(self, segment, collection=None):
+        collections = sorted(entry.name for entry in os.scandir(self.root)
+                             if entry.is_dir(follow_symlinks=False))
+        if collection is not None:
+            collections = [name for name in collections if name == collection]
+        if not collections:
+            return
+        with ThreadPoolExecutor(
+                max_workers=min(self.scan_workers, len(collections))) as pool:
+            for results in pool.map(
+                    lambda name: self._walk_segment_dir(name, segment), collections):
+                yield from results
+
+    def list_originals(self, collection=None):
+        return self._list_segment(ORIG_SEGMENT, collection)
+
+    def list_thumbnails(self, collection=None):
+        return self._list_segment(THUMB_SEGMENT, collection)
+
+    def download_object(self, key):
+        with open(self._full_path(key), 'rb') as f:
+            return f.read()
+
+    def open_object_stream(self, key):
+        return open(self._full_path(key), 'rb')
+
+    def upload_object(self, key, data, content_type='image/jpeg'):
+        path = self._full_path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'wb') as f:
+            if isinstance(data, (bytes, bytearray)):
+                f.write(data)
+            else:
+                f.write(data.read())
+
+    def get_object_metadata(self, key):
+        try:
+            stat = os.stat(self._full_path(key))
+        except FileNotFoundError:
+            return None
+        return {'size': stat.st_size, 'modified': str(stat.st_mtime_ns)}
+
+    def object_exists(self, key):
+        return os.path.exists(self._full_path(key))
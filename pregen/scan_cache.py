@@ -0,0 +1,76 @@
+"""Persistent cache of scan results for fast repeat scans.
+
+Keyed by object key with the (size, modified) pair from the LIST as the
+change fingerprint: an unchanged original keeps its prior record, so
+repeat scans only pay the record-building cost for objects that
+actually changed. Thumbnail state is deliberately not cached - it can
+change without touching the original, so every scan probes it fresh.
+"""
+
+import fcntl
+import logging
+import os
+
+import msgpack
+
+import pregen
+
+logger = logging.getLogger('pregen.scan')
+
+DEFAULT_CACHE_DIR = os.path.expanduser('~/.cache/pregen')
+
+
+class ScanCache:
+    """msgpack-on-disk map of object key -> (fingerprint, record dict)."""
+
+    def __init__(self, cache_dir=None):
+        self.path = os.path.join(cache_dir or DEFAULT_CACHE_DIR, 'scan.cache')
+        self.entries = {}
+        self.hits = 0
+        self.misses = 0
+        self._load()
+
+    def _load(self):
+        try:
+            with open(self.path, 'rb') as f:
+                fcntl.flock(f, fcntl.LOCK_SH)
+                try:
+                    data = msgpack.unpack(f, raw=False)
+                finally:
+                    fcntl.flock(f, fcntl.LOCK_UN)
+        except FileNotFoundError:
+            return
+        except Exception as err:
+            logger.warning(f"Ignoring unreadable scan cache {self.path}: {err}")
+            return
+        # A version bump may change record shape; start fresh rather than
+        # trusting stale entries.
+        if data.get('version') != pregen.__version__:
+            logger.info("Scan cache was written by another version; discarding")
+            return
+        self.entries = data.get('entries', {})
+
+    def get(self, key, size, modified):
+        entry = self.entries.get(key)
+        if entry is not None and entry[0] == modified and entry[1] == size:
+            self.hits += 1
+            return entry[2]
+        self.misses += 1
+        return None
+
+    def put(self, key, size, modified, record_dict):
+        self.entries[key] = (modified, size, record_dict)
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                msgpack.pack({'version': pregen.__version__,
+                              'entries': self.entries}, f, use_bin_type=True)
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+        os.replace(tmp_path, self.path)
+        logger.info(f"Scan cache: {self.hits:,} hits, {self.misses:,} misses, "
+                    f"{len(self.entries):,} entries saved")
@@ -0,0 +1,100 @@
+"""Walks the asset store and builds a manifest of originals and thumbnails."""
+
+import logging
+import os
+import sys
+
+from pregen.image_record import ImageRecord, ThumbnailInfo
+from pregen.manifest import Manifest
+from pregen.progress import ScannerProgress
+from pregen.s3_client import ORIG_SEGMENT, THUMB_SEGMENT
+
+logger = logging.getLogger('pregen.scan')
+
+
+class Scanner:
+    """Enumerates originals and probes for their thumbnails."""
+
+    def __init__(self, client, scales=(200,), progress=None, cache=None):
+        self.client = client
+        self.scales = tuple(scales)
+        self.progress = progress or ScannerProgress()
+        self.cache = cache
+
+    def _build_record(self, key, size, modified):
+        parts = key.split('/')
+        # Interned: one shared string per collection across all records.
+        collection = sys.intern(parts[0])
+        filename = parts[-1]
+        base_thumbnail_key = None
+        if parts[1] == ORIG_SEGMENT:
+            root, ext = os.path.splitext(
+                '/'.join([parts[0], THUMB_SEGMENT] + parts[2:]))
+            # Mirror server.resolve_file's naming: thumbnails keep the
+            # original's extension, except tiff and pdf which the server
+            # renders to PNG.
+            if ext.lower() in ('.tif', '.tiff', '.pdf'):
+                ext = '.png'
+            base_thumbnail_key = root + ext
+        record = ImageRecord(filename=filename,
+                             collection=collection,
+                             original_key=key,
+                             original_size=size,
+                             original_modified=modified,
+                             base_thumbnail_key=base_thumbnail_key)
+        return record
+
+    def _list_collections(self, lister, collections):
+        """List via one restricted call per collection, or everything.
+
+        Passing the collection down lets the client scope the LIST (or
+        directory walk) to that collection's prefix instead of
+        enumerating the whole store and filtering here.
+        """
+        if not collections:
+            yield from lister()
+            return
+        for collection in collections:
+            yield from lister(collection=collection)
+
+    def scan(self, manifest, collections=None):
+        """Populate manifest with every original found (and its thumbnails)."""
+        # One LIST over the thumbnails tree up front; existence checks
+        # below become dict lookups instead of a HEAD/stat per candidate
+        # key - on S3 that's the difference between N requests and N/1000.
+        thumbs = {key: (size, modified)
+                  for key, size, modified in self._list_collections(
+                      self.client.list_thumbnails, collections)}
+        logger.info(f"Found {len(thumbs):,} existing thumbnails")
+        for key, size, modified in self._list_collections(
+                self.client.list_originals, collections):
+            cached = self.cache.get(key, size, modified) if self.cache else None
+            if cached is not None:
+                # Unchanged since last scan: reuse the original's cached
+                # metadata. Entries written by older versions carried
+                # thumbnail info too; drop it, the probes below are
+                # authoritative.
+                record = ImageRecord.from_dict(cached)
+                record.thumbnails.clear()
+            else:
+                record = self._build_record(key, size, modified)
+                if self.cache is not None:
+                    # Cached before the probes on purpose: thumbnails can
+                    # change without the original changing, so their state
+                    # must come from this scan's listing, never the cache.
+                    self.cache.put(key, size, modified, record.to_dict())
+            for scale in self.scales:
+                thumb_key = record.get_thumbnail_key(scale)
+                thumb_meta = thumbs.get(thumb_key)
+                if thumb_meta is not None:
+                    record.add_thumbnail(ThumbnailInfo(scale=scale,
+                                                       key=thumb_key,
+                                                       size=thumb_meta[0],
+                                                       modified=thumb_meta[1]))
+            manifest.add_record(record)
+            self.progress.on_object_seen(key)
+        if self.cache is not None:
+            self.cache.save()
+        logger.info(f"Scan complete: {manifest.total_images:,} originals, "
+                    f"{manifest.total_missing_thumbnails:,} missing thumbnails")
+        return manifest
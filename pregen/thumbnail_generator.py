@@ -0,0 +1,57 @@
+"""Thumbnail rendering with Pillow."""
+
+import io
+
+from PIL import Image
+
+
+class ThumbnailGenerator:
+    """Renders bounded-box thumbnails from original image bytes."""
+
+    def __init__(self, jpeg_quality=82):
+        self.jpeg_quality = jpeg_quality
+        # Save parameters are resolved once here, keyed by destination
+        # extension, so the hot path does one dict lookup instead of
+        # rebuilding the keyword set per image.
+        jpeg_params = {'format': 'JPEG', 'quality': jpeg_quality,
+                       'optimize': False, 'progressive': False}
+        self._save_params = {
+            'jpg': jpeg_params,
+            'jpeg': jpeg_params,
+            'png': {'format': 'PNG', 'optimize': False, 'compress_level': 1},
+            'gif': {'format': 'GIF'},
+        }
+
+    def generate(self, source, scale, ext='jpg'):
+        """Render a thumbnail bounded to scale px, encoded per `ext`.
+
+        source may be bytes or a readable stream (it is handed straight
+        to Image.open, which buffers non-seekable input itself). ext is
+        the destination extension, which follows the original's per the
+        server's thumbnail naming (unknown extensions fall back to
+        JPEG). Returns the encode buffer
+        positioned at its end, so callers read the thumbnail size off
+        tell() and seek(0) to upload - no extra bytes copy of every
+        thumbnail.
+        """
+        if isinstance(source, (bytes, bytearray)):
+            source = io.BytesIO(source)
+        img = Image.open(source)
+        if img.format == 'JPEG':
+            # Let libjpeg scale during the IDCT: decoding a 6000x4000
+            # source at 1/8 size is far cheaper than full decode + resize.
+            # Ask for 2x the target so the final resample still has
+            # headroom to do the quality-determining reduction.
+            img.draft('RGB', (scale * 2, scale * 2))
+        if img.mode not in ('RGB', 'L'):
+            img = img.convert('RGB')
+        # BILINEAR is ~3x faster than LANCZOS here and the draft() step
+        # already did the big reduction, so the final pass only shrinks
+        # by <=2x where the filters are visually indistinguishable.
+        img.thumbnail((scale, scale), Image.BILINEAR)
+        out = io.BytesIO()
+        # optimize/progressive buy a few percent of size for an extra
+        # encode pass each; throughput matters more here.
+        params = self._save_params.get(ext) or self._save_params['jpg']
+        img.save(out, **params)
+        return out
@@ -85,9 +85,28 @@ CAN_THUMBNAIL = {'image/jpeg', 'image/gif', 'image/png', 'image/tiff', 'applicat
 # SERVER = 'paste' # Requires python-paste package. Fast, and seems to work good.
 SERVER = 'wsgiref'  # For testing. Requires no extra packages.
 
+# How long (seconds) metadata lookups by internal filename or MD5 may be
+# served from the in-process cache before going back to the database.
+METADATA_CACHE_TTL = 300
+
 #Image databse connection information
 SQL_USER='redacted'
 SQL_PASSWORD='redacted'
 SQL_HOST='http://instutution.org'
 SQL_PORT=3306
 SQL_DATABASE='images'
+
+# Connections held by the per-process DB pool (mysql-connector allows at
+# most 32). Worker threads pin one connection each, so size this to at
+# least the uwsgi thread count.
+SQL_POOL_SIZE = 25
+
+# Whether to reset session state when a connection is returned to the
+# pool. Connections are pinned per thread, so the reset round trip is
+# normally wasted work.
+SQL_POOL_RESET_SESSION = False
+
+# Compress the MySQL wire protocol. Worth it when the database is on
+# another host; disable for local-socket/loopback setups where it only
+# burns CPU.
+SQL_COMPRESS = True
@@ -0,0 +1,68 @@
+"""Unit tests for image_db's pattern-query construction.
+
+No database needed: these pin down the boolean-mode term rewriting and
+the statement selection around the FULLTEXT-index fallback, which the
+live-server tests only exercise against a fully migrated schema.
+"""
+
+import pytest
+
+import image_db
+
+
+@pytest.fixture(autouse=True)
+def fulltext_available(monkeypatch):
+    monkeypatch.setattr(image_db, '_fulltext_available', True)
+
+
+def test_boolean_mode_plain_token():
+    assert image_db._boolean_mode_term('CASIZ123') == '+CASIZ123*'
+
+
+def test_boolean_mode_strips_operators():
+    assert image_db._boolean_mode_term('he said "broken') == '+he +said +broken*'
+    assert image_db._boolean_mode_term('@word') == '+word*'
+    assert image_db._boolean_mode_term('weird~(thing)') == '+weird +thing*'
+
+
+def test_boolean_mode_hyphen_does_not_negate():
+    assert image_db._boolean_mode_term('abc-def') == '+abc +def*'
+
+
+def test_boolean_mode_like_wildcards():
+    # Existing clients send LIKE-style wildcards; '%' is a word break,
+    # not a syntax error, and a trailing one folds into the prefix '*'.
+    assert image_db._boolean_mode_term('DSC%') == '+DSC*'
+    assert image_db._boolean_mode_term('%casiz%123%') == '+casiz +123*'
+
+
+def test_boolean_mode_empty_term_matches_nothing():
+    assert image_db._boolean_mode_term('') == '""'
+    assert image_db._boolean_mode_term('++--""') == '""'
+
+
+def test_build_pattern_query_fulltext():
+    query, params = image_db.ImageDb()._build_pattern_query(
+        'abc-def', 'original_filename', False, None)
+    assert 'MATCH(original_filename)' in query
+    assert params == ('+abc +def*',)
+
+
+def test_build_pattern_query_exact_binds_raw_pattern():
+    query, params = image_db.ImageDb()._build_pattern_query(
+        'abc-def', 'orig_md5', True, 'ich')
+    assert 'orig_md5 = %s' in query
+    assert params == ('abc-def', 'ich')
+
+
+def test_build_pattern_query_like_fallback(monkeypatch):
+    monkeypatch.setattr(image_db, '_fulltext_available', False)
+    query, params = image_db.ImageDb()._build_pattern_query(
+        'DSC%', 'original_filename', False, 'ich')
+    assert 'LIKE' in query and 'MATCH' not in query
+    assert params == ('DSC%', 'ich')
+
+
+def test_build_pattern_query_rejects_unknown_column():
+    with pytest.raises(ValueError):
+        image_db.ImageDb()._build_pattern_query('x', 'notes', False, None)
@@ -0,0 +1,115 @@
+"""Unit tests for S3Client key and prefix handling.
+
+Unlike test_server.py these need no running server or bucket: boto3 is
+replaced by a stub that records the prefix each LIST is paged under and
+serves canned pages. They exist mainly to pin down prefix construction
+when a bucket prefix (--s3-prefix) is configured, which a live
+single-bucket test setup never exercises.
+"""
+
+from datetime import datetime
+
+import jmespath
+import pytest
+
+from pregen.config import S3Config
+from pregen.s3_client import S3Client
+
+MODIFIED = datetime(2023, 2, 2, 13, 48, 41)
+
+
+class StubPaginator:
+    def __init__(self, stub):
+        self.stub = stub
+
+    def paginate(self, **kwargs):
+        self.stub.prefixes_paged.append(kwargs.get('Prefix'))
+        page = dict(self.stub.pages.get(kwargs.get('Prefix'), {}))
+        if 'Delimiter' not in kwargs:
+            page.pop('CommonPrefixes', None)
+        return StubPages([page])
+
+
+class StubPages:
+    def __init__(self, pages):
+        self.pages = pages
+
+    def __iter__(self):
+        return iter(self.pages)
+
+    def search(self, expression):
+        # Real paginators yield None for pages the projection drops.
+        for page in self.pages:
+            results = jmespath.search(expression, page)
+            if results:
+                yield from results
+            else:
+                yield None
+
+
+class StubBoto:
+    """Just enough of a boto3 S3 client: paginators over canned pages."""
+
+    def __init__(self, pages):
+        self.pages = pages
+        self.prefixes_paged = []
+
+    def get_paginator(self, name):
+        return StubPaginator(self)
+
+
+def make_client(prefix, pages):
+    client = S3Client.__new__(S3Client)
+    client.config = S3Config(endpoint=None, bucket='assets', prefix=prefix,
+                             access_key=None, secret_key=None)
+    client.bucket = 'assets'
+    client.prefix = prefix.strip('/')
+    client.list_workers = 2
+    client.client = StubBoto(pages)
+    return client
+
+
+def contents(*keys):
+    return [{'Key': key, 'Size': 1000, 'LastModified': MODIFIED} for key in keys]
+
+
+@pytest.mark.parametrize('prefix,base', [('', ''), ('attachments', 'attachments/')])
+def test_list_originals_all_collections(prefix, base):
+    pages = {
+        base: {'CommonPrefixes': [{'Prefix': f'{base}ich/'}]},
+        f'{base}ich/originals/': {
+            'Contents': contents(f'{base}ich/originals/ab/cd/one.jpg')},
+    }
+    client = make_client(prefix, pages)
+    listed = list(client.list_originals())
+    assert listed == [('ich/originals/ab/cd/one.jpg', 1000, MODIFIED.isoformat())]
+    for paged in client.client.prefixes_paged:
+        assert '//' not in paged
+
+
+@pytest.mark.parametrize('prefix,base', [('', ''), ('attachments', 'attachments/')])
+def test_list_originals_single_collection(prefix, base):
+    pages = {
+        f'{base}ich/originals/': {
+            'CommonPrefixes': [{'Prefix': f'{base}ich/originals/ab/'}],
+            'Contents': contents(f'{base}ich/originals/direct.jpg')},
+        f'{base}ich/originals/ab/': {
+            'Contents': contents(f'{base}ich/originals/ab/sharded.jpg',
+                                 f'{base}ich/originals/ab/notes.txt')},
+    }
+    client = make_client(prefix, pages)
+    listed = sorted(client.list_originals(collection='ich'))
+    assert listed == [('ich/originals/ab/sharded.jpg', 1000, MODIFIED.isoformat()),
+                      ('ich/originals/direct.jpg', 1000, MODIFIED.isoformat())]
+    assert client.client.prefixes_paged[0] == f'{base}ich/originals/'
+    for paged in client.client.prefixes_paged:
+        assert '//' not in paged
+
+
+def test_full_and_relative_keys_round_trip():
+    client = make_client('attachments', {})
+    assert client._full_key('ich/originals/a.jpg') == 'attachments/ich/originals/a.jpg'
+    assert client._relative_key('attachments/ich/originals/a.jpg') == 'ich/originals/a.jpg'
+    bare = make_client('', {})
+    assert bare._full_key('ich/originals/a.jpg') == 'ich/originals/a.jpg'
+    assert bare._relative_key('ich/originals/a.jpg') == 'ich/originals/a.jpg'
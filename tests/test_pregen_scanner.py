@@ -0,0 +1,56 @@
+"""Unit tests for the scanner's thumbnail-key derivation.
+
+These run over a temporary local attachment tree (no server, no S3) and
+pin the scanner's thumbnail naming to server.resolve_file's scheme:
+thumbnails keep the original's extension, except tiff and pdf which the
+server renders to PNG.
+"""
+
+import os
+
+import pytest
+from PIL import Image
+
+from pregen.config import LocalConfig
+from pregen.manifest import Manifest
+from pregen.s3_client import LocalClient
+from pregen.scanner import Scanner
+
+
+def write_image(root, relpath, size=(40, 30)):
+    path = os.path.join(root, *relpath.split('/'))
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    Image.new('RGB', size, 'red').save(path)
+    return path
+
+
+def scan_tree(root):
+    scanner = Scanner(LocalClient(LocalConfig(root=str(root))), scales=(200,))
+    manifest = Manifest(storage_type='local', local_root=str(root))
+    scanner.scan(manifest)
+    return manifest
+
+
+@pytest.mark.parametrize('original,thumbnail', [
+    ('one.jpg', 'one_200.jpg'),
+    ('two.gif', 'two_200.gif'),
+    ('three.png', 'three_200.png'),
+    ('four.tif', 'four_200.png'),
+])
+def test_scanner_matches_server_thumbnail_names(tmp_path, original, thumbnail):
+    write_image(tmp_path, f'ich/originals/ab/cd/{original}')
+    write_image(tmp_path, f'ich/thumbnails/ab/cd/{thumbnail}')
+    manifest = scan_tree(tmp_path)
+    assert manifest.total_images == 1
+    assert manifest.total_missing_thumbnails == 0
+    record, = manifest.records
+    assert record.get_thumbnail_key(200) == f'ich/thumbnails/ab/cd/{thumbnail}'
+
+
+def test_scanner_reports_unthumbnailed_png_missing(tmp_path):
+    write_image(tmp_path, 'ich/originals/ab/cd/three.png')
+    # A .jpg thumbnail is not what resolve_file serves for a PNG
+    # original, so it must not count as coverage.
+    write_image(tmp_path, 'ich/thumbnails/ab/cd/three_200.jpg')
+    manifest = scan_tree(tmp_path)
+    assert manifest.total_missing_thumbnails == 1